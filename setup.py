@@ -11,6 +11,8 @@ setup(
     license='MIT License',
     packages=['wildpath'],
     install_requires=['boolean.py'],
+    extras_require={'numpy': ['numpy']},
+    entry_points={'console_scripts': ['wildpath = wildpath.cli:main']},
     classifiers=[
         # How mature is this project? Common values are
         #   3 - Alpha
@@ -0,0 +1,121 @@
+import unittest
+
+from threading import Thread
+
+from wildpath import WildPath
+from wildpath.cache import LRUCache
+
+
+class TestLRUCache(unittest.TestCase):
+
+    def test_lru(self):
+        cache = LRUCache(maxsize=2)
+        cache["a"] = 1
+        cache["b"] = 2
+        self.assertEqual(cache["a"], 1)  # 'a' is now the most recently used
+        cache["c"] = 3
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertEqual(len(cache), 2)
+        with self.assertRaises(KeyError):
+            cache["b"]
+
+    def test_get_or_create(self):
+        cache = LRUCache(maxsize=10)
+        calls = []
+
+        def factory(key):
+            calls.append(key)
+            return key.upper()
+
+        self.assertEqual(cache.get_or_create("a", factory), "A")
+        self.assertEqual(cache.get_or_create("a", factory), "A")
+        self.assertEqual(calls, ["a"])
+        self.assertEqual(cache.cache_info(), (1, 1, 10, 1))
+
+    def test_resize_clear(self):
+        cache = LRUCache(maxsize=None)
+        for i in range(100):
+            cache[i] = i
+        cache.get(99)
+        cache.resize(10)
+        self.assertEqual(len(cache), 10)
+        self.assertIn(99, cache)
+        cache.clear()
+        self.assertEqual(cache.cache_info(), (0, 0, 10, 0))
+        with self.assertRaises(ValueError):
+            LRUCache(-1)
+
+    def test_threads(self):
+        cache = LRUCache(maxsize=50)
+
+        def run(offset):
+            for i in range(2000):
+                key = (i + offset) % 100
+                self.assertEqual(cache.get_or_create(key, str), str(key))
+
+        threads = [Thread(target=run, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        info = cache.cache_info()
+        self.assertEqual(info.currsize, 50)
+        self.assertEqual(info.hits + info.misses, 16000)
+
+
+class TestKeyCache(unittest.TestCase):
+
+    def setUp(self):
+        self.maxsize = WildPath.key_cache.maxsize
+
+    def tearDown(self):
+        WildPath.key_cache.resize(self.maxsize)
+
+    def test_bounded(self):
+        WildPath.key_cache.resize(5)
+        paths = [WildPath("a%d*.b|c" % i) for i in range(20)]
+        self.assertEqual(len(WildPath.key_cache), 5)
+        obj = {"a1x": {"b": 1, "c": 2}}
+        self.assertEqual(paths[1].get_in(obj), {"a1x": {"b": 1, "c": 2}})  # works with evicted keys
+        self.assertEqual(WildPath("a1*.b|c").get_in(obj), {"a1x": {"b": 1, "c": 2}})
+
+    def test_statistics(self):
+        WildPath.key_cache.clear()
+        WildPath("x*.y*")
+        WildPath("x*.z")
+        self.assertEqual(WildPath.key_cache.cache_info()[:2], (1, 2))
+
+
+class TestPlanCache(unittest.TestCase):
+
+    def test_subclasses(self):
+        class SlashPath(WildPath):
+            __slots__ = ()
+            sep = "/"
+
+        path, slash_path = WildPath("a.*"), SlashPath("a/*")
+        self.assertEqual(path, slash_path)  # equal tuples
+        self.assertIsNot(path.compile(), slash_path.compile())
+        self.assertIs(slash_path.compile().path.__class__, SlashPath)
+        self.assertIs(slash_path.compile(), SlashPath("a/*").compile())
+
+    def test_bounded(self):
+        maxsizes = WildPath.key_cache.maxsize, WildPath.plan_cache.maxsize
+        WildPath.key_cache.resize(10)
+        WildPath.plan_cache.resize(10)
+        try:
+            for i in range(100):
+                self.assertEqual(WildPath("a%d*.b|c" % i).get_in({"a%dx" % i: {"b": i}}), {"a%dx" % i: {"b": i}})
+            self.assertEqual(len(WildPath.key_cache), 10)
+            self.assertEqual(len(WildPath.plan_cache), 10)  # plans keep parsed keys: bounded as well
+        finally:
+            WildPath.key_cache.resize(maxsizes[0])
+            WildPath.plan_cache.resize(maxsizes[1])
+
+    def test_default_size(self):
+        self.assertEqual(WildPath.plan_cache.maxsize, WildPath.key_cache.maxsize)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+from contextlib import redirect_stdout, redirect_stderr
+
+from tests.samples import google_route
+from wildpath import WildPath
+from wildpath.cli import main
+
+
+class TestCommandLine(unittest.TestCase):
+
+    records = [{"id": i, "payload": {"items": [{"price": j} for j in range(i % 3)]}} for i in range(20)]
+
+    @classmethod
+    def setUpClass(cls):
+        cls.filenames = []
+        for suffix, text in ((".json", json.dumps(google_route)),
+                             (".jsonl", "".join(json.dumps(record) + "\n" for record in cls.records))):
+            fd, filename = tempfile.mkstemp(suffix=suffix)
+            with os.fdopen(fd, "w") as fp:
+                fp.write(text)
+            cls.filenames.append(filename)
+        cls.json_file, cls.jsonl_file = cls.filenames
+
+    @classmethod
+    def tearDownClass(cls):
+        for filename in cls.filenames:
+            os.remove(filename)
+
+    def run_main(self, *argv, **kwargs):
+        """ returns the exit code and the output lines of main(argv) """
+        stdout, stderr = io.StringIO(), io.StringIO()
+        stdin, sys.stdin = sys.stdin, kwargs.get("stdin", sys.stdin)
+        try:
+            with redirect_stdout(stdout), redirect_stderr(stderr):
+                code = main(list(argv))
+        finally:
+            sys.stdin = stdin
+        return code, stdout.getvalue().splitlines()
+
+    def test_document(self):
+        path_string = "routes.*.legs.*.steps.*.distance.value"
+        code, lines = self.run_main(path_string, "-f", self.json_file)
+        self.assertEqual(code, 0)
+        self.assertEqual(json.loads("\n".join(lines)), WildPath(path_string).get_in(google_route))
+        code, lines = self.run_main(path_string, "status", "--flat", "--jsonl", "-f", self.json_file)
+        self.assertEqual(json.loads(lines[0]), {path_string: WildPath(path_string).get_in(google_route, flat=True),
+                                                "status": "OK"})
+
+    def test_document_flat_values(self):
+        path_string = "routes.*.legs.*.steps.*.distance.value"
+        code, lines = self.run_main(path_string, "--flat", "--jsonl", "-f", self.json_file)
+        self.assertEqual([json.loads(line) for line in lines], WildPath(path_string).get_in(google_route, flat=True))
+
+    def test_document_flat_default(self):
+        stdin = io.TextIOWrapper(io.BytesIO(b'{"a": [{"x": 1}, {"y": 2}, {"x": 3}], "b": {"d": 1, "c": 2}}'))
+        code, lines = self.run_main("a.*.x", "--flat", "-d", "null", stdin=stdin)
+        self.assertEqual((code, json.loads("\n".join(lines))), (0, [1, None, 3]))
+        stdin.seek(0)
+        self.assertEqual(self.run_main("a.*.x", "--flat", "--jsonl", "-d", "0", stdin=stdin), (0, ["1", "0", "3"]))
+        stdin.seek(0)
+        self.assertEqual(self.run_main("b.c|d", "--flat", "--jsonl", stdin=stdin), (0, ["2", "1"]))  # path order
+
+    def test_document_flat_missing(self):
+        for flat in ([], ["--flat"], ["--flat", "--jsonl"]):
+            stdin = io.TextIOWrapper(io.BytesIO(b'{"a": [{"x": 1}, {"y": 2}, {"x": 3}]}'))
+            code, lines = self.run_main("a.*.x", *flat, stdin=stdin)
+            self.assertEqual(code, 1)
+            self.assertNotIn("3", lines)
+
+    def test_lines(self):
+        expected = [WildPath("payload.items.*.price").get_in(record) for record in self.records]
+        for workers in ([], ["--workers", "2"], ["--workers", "2", "--unordered"]):
+            code, lines = self.run_main("payload.items.*.price", "--lines", "--jsonl", "-f", self.jsonl_file,
+                                        *workers)
+            self.assertEqual(code, 0)
+            if "--unordered" in workers:
+                self.assertEqual(sorted(json.loads(line) for line in lines), sorted(expected))
+            else:
+                self.assertEqual([json.loads(line) for line in lines], expected)
+
+    def test_stdin(self):
+        with open(self.jsonl_file, "rb") as fp:
+            stdin = io.TextIOWrapper(io.BytesIO(fp.read()))
+        code, lines = self.run_main("id", "payload.items.0.price", "-l", "--jsonl", "-d", "null", "-w", "2",
+                                    stdin=stdin)
+        self.assertEqual(json.loads(lines[1]), {"id": 1, "payload.items.0.price": 0})
+        self.assertEqual(json.loads(lines[3]), {"id": 3, "payload.items.0.price": None})
+
+    def test_errors(self):
+        code, lines = self.run_main("payload.missing", "-l", "-f", self.jsonl_file)
+        self.assertEqual((code, lines), (1, []))
+        with redirect_stderr(io.StringIO()):
+            with self.assertRaises(SystemExit):
+                main(["status", "--workers", "2"])
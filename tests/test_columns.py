@@ -0,0 +1,44 @@
+import unittest
+
+from tests.samples import google_route
+from wildpath import WildPath
+from wildpath.columns import build_array, import_numpy
+
+numpy = import_numpy()
+
+
+class TestColumns(unittest.TestCase):
+
+    records = [{"metrics": {"latency_ms": 1.5}}, {"metrics": {}}, {"metrics": {"latency_ms": None}},
+               {"other": 1}, {"metrics": {"latency_ms": 3}}]
+
+    def assertArray(self, result, data, mask):
+        self.assertEqual([float(v) for v in result.data], data)
+        self.assertEqual([bool(m) for m in result.mask], mask)
+
+    def test_build_array(self):
+        self.assertArray(build_array(iter([1, 2, None, 4]), fill_value=-1), [1.0, 2.0, -1.0, 4.0],
+                         [False, False, True, False])
+        self.assertArray(build_array([]), [], [])
+
+    def test_to_array(self):
+        result = WildPath("*.metrics.latency_ms").to_array(self.records)
+        self.assertArray(result, [1.5, 0.0, 0.0, 0.0, 3.0], [False, True, True, True, False])
+        path = WildPath("routes.*.legs.*.steps.*.distance.value")
+        self.assertArray(path.to_array(google_route), [float(v) for v in path.get_in(google_route, flat=True)],
+                         [False] * len(path.get_in(google_route, flat=True)))
+
+    def test_to_columns(self):
+        columns = WildPath.to_columns(self.records, {"latency": "*.metrics.latency_ms",
+                                                     "other": WildPath("*.other")},
+                                      dtype={"latency": "d", "other": "B"})
+        self.assertEqual(list(columns), ["latency", "other"])
+        self.assertArray(columns["latency"], [1.5, 0.0, 0.0, 0.0, 3.0], [False, True, True, True, False])
+        self.assertArray(columns["other"], [0.0, 0.0, 0.0, 1.0, 0.0], [True, True, True, False, True])
+
+    @unittest.skipIf(numpy is None, "numpy is not installed")
+    def test_numpy(self):
+        result = WildPath("*.metrics.latency_ms").to_array(self.records)
+        self.assertIsInstance(result, numpy.ma.MaskedArray)
+        self.assertEqual(result.sum(), 4.5)
+        self.assertEqual(result.count(), 2)
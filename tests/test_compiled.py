@@ -0,0 +1,171 @@
+import sys
+import unittest
+
+from copy import deepcopy
+
+from tests.samples import agenda
+from wildpath import Path, WildPath
+
+
+class Object(object):
+
+    def __init__(self, **kwargs):
+        for k, v in kwargs.items():
+            setattr(self, k, v)
+
+
+class ListObject(list):
+
+    def __init__(self, items, value):
+        super(ListObject, self).__init__(items)
+        self.value = value
+
+
+class Config(object):
+    """ object with properties that count their evaluations """
+
+    evaluated = []
+
+    def __init__(self):
+        self.db_name = "name"
+        self.db_host = {"x": 1}
+
+
+for _name in ["prop_%d" % _i for _i in range(20)] + ["db_port"]:
+    setattr(Config, _name, property(lambda self, n=_name: self.evaluated.append(n) or n))
+
+
+class TestCompiledPath(unittest.TestCase):
+
+    def setUp(self):
+        self.agenda = deepcopy(agenda)
+
+    def test_get(self):
+        for path_string in ["items.0.duration", "invited.-1", "items.2.subjects.1", "meeting"]:
+            path = Path(path_string)
+            compiled = path.compile()
+            for _ in range(3):  # first call specializes, later calls use the inline caches
+                self.assertEqual(compiled.get_in(self.agenda), path.get_in(self.agenda))
+
+    def test_get_changing_types(self):
+        compiled = Path("a.1").compile()
+        self.assertEqual(compiled.get_in({"a": [0, 1]}), 1)
+        self.assertEqual(compiled.get_in(Object(a={"1": 2})), 2)
+        self.assertEqual(compiled.get_in({"a": (3, 4)}), 4)
+        self.assertEqual(compiled.get_in(Object(a=ListObject([5, 6], "x"))), 6)
+        self.assertEqual(Path("a.value").compile().get_in({"a": ListObject([5, 6], "x")}), "x")
+
+    def test_default_and_exceptions(self):
+        compiled = Path("items.5.name").compile()
+        self.assertEqual(compiled.get_in(self.agenda, None), None)
+        self.assertFalse(compiled.has_in(self.agenda))
+        with self.assertRaises(IndexError):
+            compiled.get_in(self.agenda)
+        with self.assertRaises(KeyError):
+            Path("items.0.x").compile().get_in(self.agenda)
+        with self.assertRaises(AttributeError):
+            Path("a.x").compile().get_in(Object(a=Object()))
+
+    def test_set_del_pop(self):
+        compiled = Path("items.0.duration").compile()
+        compiled.set_in(self.agenda, "10 minutes")
+        self.assertEqual(self.agenda["items"][0]["duration"], "10 minutes")
+        self.assertEqual(compiled.pop_in(self.agenda), "10 minutes")
+        self.assertFalse(compiled.has_in(self.agenda))
+
+        compiled = Path("a.1").compile()
+        obj = Object(a=[0, 1, 2])
+        compiled.set_in(obj, 3)
+        self.assertEqual(obj.a, [0, 3, 2])
+        compiled.del_in(obj)
+        self.assertEqual(obj.a, [0, 2])
+
+        compiled = Path("a").compile()
+        obj = Object(a=1)
+        compiled.set_in(obj, 2)
+        self.assertEqual(obj.a, 2)
+        compiled.del_in(obj)
+        self.assertFalse(hasattr(obj, "a"))
+        compiled.set_in(obj, 3)  # same cached type
+        self.assertEqual(obj.a, 3)
+
+    def test_call_in(self):
+        self.assertEqual(Path("a.count").compile().call_in({"a": [1, 1, 2]}, 1), 2)
+
+
+class TestCompiledWildPath(unittest.TestCase):
+
+    def setUp(self):
+        self.agenda = deepcopy(agenda)
+
+    def test_plan(self):
+        compiled = WildPath("items.*.subjects.0|-1").compile()
+        self.assertEqual([step[0] for step in compiled.steps], ["items", "*", "subjects", "0|-1"])
+        self.assertEqual([step[1] for step in compiled.steps], [None, None, None, None])
+        self.assertEqual(compiled.depth, 1)
+        self.assertEqual(compiled.get_in(self.agenda), [["purpose of the meeting"],
+                                                        ["milestones", "actions"],
+                                                        ["questions", "roundup"]])
+
+    def test_compile_once(self):
+        path = WildPath("items.*.name")
+        self.assertIs(path.compile(), path.compile())
+
+    def test_deep_path(self):
+        depth = 3 * sys.getrecursionlimit()
+        obj = value = {}
+        for _ in range(depth):
+            value["a"] = {}
+            value = value["a"]
+        value["b"] = 1
+        path = WildPath(["a"] * depth + ["*"])
+        self.assertEqual(path.get_in(obj), {"b": 1})
+        path.set_in(obj, 2)
+        self.assertEqual(path.get_in(obj), {"b": 2})
+        path.del_in(obj)
+        self.assertEqual(path.get_in(obj), {})
+
+    def test_set_del_order(self):
+        obj = [[0, 1, 2], [3, 4, 5]]
+        WildPath("*.!1").set_in(obj, [[6, 7], [8, 9]])
+        self.assertEqual(obj, [[6, 1, 7], [8, 4, 9]])
+        WildPath("*.::2").del_in(obj)
+        self.assertEqual(obj, [[1], [4]])
+        obj = list(range(6))
+        WildPath("1:4").del_in(obj)
+        self.assertEqual(obj, [0, 4, 5])
+        WildPath("::-1").del_in(obj)
+        self.assertEqual(obj, [])
+
+
+class TestLazyAttributes(unittest.TestCase):
+
+    def setUp(self):
+        del Config.evaluated[:]
+
+    def test_get(self):
+        self.assertEqual(WildPath("db_*").get_in(Config()), {"db_host": {"x": 1}, "db_name": "name",
+                                                             "db_port": "db_port"})
+        self.assertEqual(WildPath("db_*|prop_1").get_in(Config(), flat=True), [{"x": 1}, "name", "db_port", "prop_1"])
+        self.assertEqual(list(WildPath("!prop_*&!db_h*&!evaluated").iter_in(Config())), [(("db_name",), "name"),
+                                                                               (("db_port",), "db_port")])
+        self.assertEqual(Config.evaluated, ["db_port", "db_port", "prop_1", "db_port"])
+
+    def test_set_del(self):
+        config = Config()
+        WildPath("db_n*").set_in(config, "other")
+        WildPath("db_h*.x").set_in(config, 2)
+        self.assertEqual((config.db_name, config.db_host), ("other", {"x": 2}))
+        WildPath("db_h*.x").del_in(config)
+        WildPath("db_n*").del_in(config)
+        self.assertEqual(config.__dict__, {"db_host": {}})
+        self.assertEqual(Config.evaluated, [])
+
+    def test_items_match(self):
+        self.assertEqual(list(Path.items(Config(), match="db_p*|db_n*")), [(("db_name",), "name"),
+                                                                          (("db_port",), "db_port")])
+        self.assertEqual(Config.evaluated, ["db_port"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import json
+import os
+import tempfile
+import unittest
+
+from concurrent.futures import ThreadPoolExecutor
+
+from wildpath import PathSet, scan_jsonl
+from wildpath.jsonl import line_ranges
+
+
+class TestScanJSONL(unittest.TestCase):
+
+    patterns = ["id", "payload.items.*.price", "payload.name"]
+
+    @classmethod
+    def setUpClass(cls):
+        cls.records = [{"id": i, "payload": {"items": [{"price": j} for j in range(i % 4)], "name": "é%d" % i}}
+                       for i in range(300)]
+        fd, cls.filename = tempfile.mkstemp(suffix=".jsonl")
+        with os.fdopen(fd, "w", encoding="utf-8") as fp:
+            for i, record in enumerate(cls.records):
+                fp.write(json.dumps(record, ensure_ascii=False) + ("\n\n" if i % 50 == 0 else "\n"))
+        path_set = PathSet(cls.patterns)
+        cls.expected = [path_set.get_in(record) for record in cls.records]
+
+    @classmethod
+    def tearDownClass(cls):
+        os.remove(cls.filename)
+
+    def test_line_ranges(self):
+        ranges = line_ranges(self.filename, 1000)
+        self.assertEqual(ranges[0][0], 0)
+        self.assertEqual(ranges[-1][1], os.path.getsize(self.filename))
+        with open(self.filename, "rb") as fp:
+            data = fp.read()
+        for (_, end), (start, _) in zip(ranges, ranges[1:]):
+            self.assertEqual(end, start)
+            self.assertEqual(data[end - 1:end], b"\n")
+
+    def test_scan(self):
+        self.assertEqual(list(scan_jsonl(self.filename, self.patterns)), self.expected)
+        self.assertEqual(list(scan_jsonl(self.filename, self.patterns, range_size=100)), self.expected)
+
+    def test_workers(self):
+        self.assertEqual(list(scan_jsonl(self.filename, self.patterns, workers=2, range_size=1000)), self.expected)
+        results = list(scan_jsonl(self.filename, self.patterns, workers=2, ordered=False, range_size=1000))
+        self.assertEqual(sorted(results, key=lambda result: result["id"]), self.expected)
+        with ThreadPoolExecutor(2) as executor:
+            self.assertEqual(list(scan_jsonl(self.filename, self.patterns, workers=executor, range_size=1000)),
+                             self.expected)
+
+    def test_default(self):
+        results = list(scan_jsonl(self.filename, {"id": None, "payload.missing": 0}, workers=2, range_size=1000))
+        self.assertEqual(results[3], {"id": 3, "payload.missing": 0})
+        with self.assertRaises(KeyError):
+            list(scan_jsonl(self.filename, ["payload.missing"], workers=2))
+
+    def test_empty(self):
+        fd, filename = tempfile.mkstemp(suffix=".jsonl")
+        os.close(fd)
+        try:
+            self.assertEqual(list(scan_jsonl(filename, self.patterns, workers=2)), [])
+        finally:
+            os.remove(filename)
@@ -0,0 +1,91 @@
+import io
+import json
+import unittest
+
+from tests.samples import google_route, agenda
+from wildpath import Path, WildPath
+from wildpath.jsonstream import JSONReader, iter_flat_json, in_document_order
+
+
+class TestJSONStream(unittest.TestCase):
+
+    documents = [google_route, agenda, [[1], [{}, [[-2.5e10], []], "", {"a": "x]}\\\"{"}], "é"]]
+
+    path_strings = ["*", "*.*", "*.-1", "!a.*", "0:2.*", "*.1:", "routes.*.legs.*.steps.*.distance.value",
+                    "items.*.subjects.:2", "routes.0.bounds.north*|south*.lat", "*.*.*.*", "(a*&!ax)|1.*"]
+
+    def test_read_values(self):
+        text = '{"a": [1, -2.5e10, "s\\"]", true, null], "b": {"c": {}}, "d": 12345678901234567890}'
+        for chunk_size in (1, 2, 5, 1000):
+            reader = JSONReader(io.StringIO(text), chunk_size)
+            keys = []
+            for key in reader.iter_object_keys():
+                keys.append(key)
+                if key == "d":
+                    self.assertEqual(reader.parse_value(), 12345678901234567890)
+                else:
+                    reader.skip_value()
+            self.assertEqual(keys, ["a", "b", "d"])
+
+    @staticmethod
+    def _sorted_items(items):
+        """ the items as sorted strings (the order of iter_json is the order of the document) or the error type """
+        try:
+            return sorted((str(p), json.dumps(v)) for p, v in items)
+        except TypeError as error:  # e.g. a slice selecting the keys of an object
+            return type(error)
+
+    def test_iter_json(self):
+        for document in self.documents:
+            text = json.dumps(document)
+            for path_string in self.path_strings:
+                path = WildPath(path_string)
+                expected = self._sorted_items(path.iter_in(document))
+                for chunk_size in (1, 7, 65536):
+                    for fp in (io.StringIO(text), io.BytesIO(text.encode("utf-8"))):
+                        self.assertEqual(self._sorted_items(path.iter_json(fp, chunk_size)), expected)
+        fp = io.StringIO(json.dumps(google_route))
+        self.assertEqual(next(WildPath("status").iter_json(fp)), (Path("status"), "OK"))
+
+    def test_document_order(self):
+        fp = io.StringIO('{"b": 1, "a": 2, "c": {"a": 3}}')
+        self.assertEqual(list(WildPath("a|b").iter_json(fp)), [(Path("b"), 1), (Path("a"), 2)])
+
+    def test_iter_flat_json(self):
+        text = '{"a": [{"x": 1}, {"y": 2}, {"x": [3]}], "b": "cd", "c": [[1], 2]}'
+        document = json.loads(text)
+        for path_string in ["a.*.x", "a.1|0.x", "a.*.x.0", "b.*", "c.*.0", "missing.*", "a.5", "a.-1.*"]:
+            path = WildPath(path_string)
+            for default in (None, [7, [8]]):
+                for chunk_size in (1, 65536):
+                    values = list(iter_flat_json(io.StringIO(text), path, default, chunk_size))
+                    if in_document_order(path):
+                        self.assertEqual(values, path.get_in(document, default, flat=True))
+                    else:
+                        self.assertEqual(sorted(map(json.dumps, values)),
+                                         sorted(map(json.dumps, path.get_in(document, default, flat=True))))
+        self.assertEqual(list(iter_flat_json(io.StringIO(text), WildPath("a.*.x"), None)), [1, None, [3]])
+        for path_string, error in (("a.*.x", KeyError), ("a.5", IndexError), ("missing.*", KeyError)):
+            with self.assertRaises(error):
+                list(iter_flat_json(io.StringIO(text), WildPath(path_string)))
+        self.assertFalse(in_document_order(WildPath("a.1|0.x")))
+
+    def test_get_json(self):
+        text = json.dumps(google_route)
+        for path_string in ["routes.0.legs.0.distance.text", "routes.0.legs.0.steps.-1.end_location", "status",
+                            "geocoded_waypoints.1.types"]:
+            path = Path(path_string)
+            self.assertEqual(path.get_json(io.StringIO(text)), path.get_in(google_route))
+        self.assertEqual(Path("routes.0.missing").get_json(io.StringIO(text), None), None)
+        with self.assertRaises(KeyError):
+            Path("routes.5").get_json(io.StringIO(text))
+
+    def test_skipped_values_not_decoded(self):
+        fp = io.StringIO('{"a": {"b": 1}, "skipped": [1, 2, nonsense, {"x": tru, "[": "]"}], "c": 2}')
+        self.assertEqual(Path("c").get_json(fp), 2)
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            list(WildPath("*.a").iter_json(io.StringIO('[{"a": 1}, {"a": 2')))
+        with self.assertRaises(ValueError):
+            list(WildPath("*").iter_json(io.StringIO('{"a" 1}')))
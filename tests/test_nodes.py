@@ -0,0 +1,248 @@
+import gc
+import unittest
+import uuid
+
+from collections import OrderedDict, namedtuple
+from fractions import Fraction
+from pathlib import PurePosixPath
+from types import MappingProxyType
+
+from wildpath import Path, WildPath
+from wildpath.nodes import node_kinds, classify, register, NodeKind, LEAF, OBJECT, MAPPING, SEQUENCE
+from wildpath.nodes import object_schemas, slot_names, record_fields, METHOD, DESCRIPTOR, CLASS_DATA, NAMED_TUPLE_KIND
+from wildpath.nodes import MUTABLE_MAPPING_KIND, MAPPING_KIND, MUTABLE_SEQUENCE_KIND, SEQUENCE_KIND, \
+    VALUE_SEQUENCE_KIND, MUTABLE_VALUE_SEQUENCE_KIND, OBJECT_KIND, VALUE_KIND
+from wildpath.tools import flatten
+
+
+class Object(object):
+    pass
+
+
+class Record(object):
+    """ container that does not implement the Mapping abstract base class """
+
+    def __init__(self, **kwargs):
+        self.data = dict(kwargs)
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def __setitem__(self, key, value):
+        self.data[key] = value
+
+    def __delitem__(self, key):
+        del self.data[key]
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def items(self):
+        return self.data.items()
+
+    def values(self):
+        return self.data.values()
+
+
+class SubRecord(Record):
+    pass
+
+
+class TestNodeKinds(unittest.TestCase):
+
+    def tearDown(self):
+        if Record in node_kinds._registered:
+            node_kinds.unregister(Record)
+
+    def test_classify(self):
+        self.assertIs(classify(dict), MUTABLE_MAPPING_KIND)
+        self.assertIs(classify(OrderedDict), MUTABLE_MAPPING_KIND)
+        self.assertIs(classify(MappingProxyType), MAPPING_KIND)
+        self.assertIs(classify(list), MUTABLE_SEQUENCE_KIND)
+        self.assertIs(classify(tuple), SEQUENCE_KIND)
+        self.assertIs(classify(str), VALUE_SEQUENCE_KIND)
+        self.assertIs(classify(bytes), VALUE_SEQUENCE_KIND)
+        self.assertIs(classify(bytearray), MUTABLE_VALUE_SEQUENCE_KIND)
+        self.assertIs(classify(Object), OBJECT_KIND)
+        self.assertIs(classify(int), VALUE_KIND)
+        self.assertIs(classify(type(None)), VALUE_KIND)
+
+    def test_lazy_registry(self):
+        class Local(object):
+            pass
+
+        self.assertNotIn(Local, node_kinds)
+        self.assertIs(node_kinds[Local], OBJECT_KIND)
+        self.assertIn(Local, node_kinds)
+
+    def test_register(self):
+        record = Record(a=Record(b=1), c=2)
+        self.assertEqual(node_kinds[Record].read, OBJECT)
+        with self.assertRaises(AttributeError):
+            Path("a.b").get_in(record)
+        node_kinds[SubRecord]  # cached before registration of the base class
+
+        register(Record, MUTABLE_MAPPING_KIND)
+        self.assertIs(node_kinds[SubRecord], MUTABLE_MAPPING_KIND)
+        self.assertEqual(Path("a.b").get_in(record), 1)
+        self.assertEqual(WildPath("a|c").get_in(record), {"a": record["a"], "c": 2})
+        self.assertEqual(WildPath("*.b").get_in(Record(x=Record(b=3))), {"x": 3})
+        self.assertEqual(flatten(Record(x=Record(b=3), y=4)), [3, 4])
+        self.assertEqual(dict(Path.items(record)), {("a", "b"): 1, ("c",): 2})
+
+        Path("a.b").set_in(record, 5)
+        WildPath("c").set_in(record, 6)
+        self.assertEqual(Path("a.b").get_in(record), 5)
+        self.assertEqual(Path("c").compile().get_in(record), 6)
+        WildPath("a|c").del_in(record)
+        self.assertEqual(record.data, {})
+
+    def test_register_kind_type(self):
+        with self.assertRaises(TypeError):
+            register(Record, MAPPING)
+
+    def test_custom_kind(self):
+        class Leafy(dict):
+            pass
+
+        register(Leafy, NodeKind(MAPPING, MAPPING, LEAF))  # readable, but not iterated over
+        try:
+            obj = {"a": Leafy(b=1)}
+            self.assertEqual(list(Path.items(obj)), [(("a",), {"b": 1})])
+            self.assertEqual(Path("a.b").get_in(obj), 1)
+        finally:
+            node_kinds.unregister(Leafy)
+        self.assertEqual(node_kinds[Leafy].walk, MAPPING)
+        self.assertEqual(node_kinds[list].walk, SEQUENCE)
+
+
+class Attributes(object):
+    constant = 1
+
+    def __init__(self):
+        self.value = 2
+
+    def method(self):
+        return 3
+
+    @property
+    def prop(self):
+        return 4
+
+
+class TestObjectSchemas(unittest.TestCase):
+
+    def test_kinds(self):
+        schema = object_schemas[Attributes]
+        self.assertIs(object_schemas[Attributes], schema)
+        self.assertEqual(schema.kinds, {"constant": CLASS_DATA, "method": METHOD, "prop": DESCRIPTOR})
+
+    def test_attribute_names(self):
+        obj = Attributes()
+        obj.extra = obj.method = obj.constant = 5
+        names = [name for name in dir(obj) if not (name.startswith("__") and name.endswith("__"))]
+        self.assertEqual(list(object_schemas[Attributes].attribute_names(obj)), names)
+        self.assertEqual(list(object_schemas[type].attribute_names(Attributes)),
+                         [name for name in dir(Attributes) if not (name.startswith("__") and name.endswith("__"))])
+
+    def test_traversal(self):
+        obj = Attributes()
+        self.assertEqual(list(Path.items(obj)), [(("prop",), 4), (("value",), 2)])
+        self.assertEqual(WildPath("*").get_in(obj), {"constant": 1, "prop": 4, "value": 2})
+
+    def test_weak(self):
+        class Local(object):
+            pass
+
+        object_schemas[Local]
+        count = len(object_schemas)
+        del Local
+        gc.collect()
+        self.assertEqual(len(object_schemas), count - 1)
+
+
+Point = namedtuple("Point", "x y")
+
+
+class Slotted(object):
+    __slots__ = ("a", "__b", "c")
+
+    def __init__(self, a, b):
+        self.a = a
+        self.__b = b
+
+    @property
+    def prop(self):
+        return 0
+
+
+class SubSlotted(Slotted):
+    __slots__ = "d"
+
+
+try:
+    from dataclasses import dataclass
+except ImportError:  # python < 3.7
+    dataclass = None
+
+
+class TestRecords(unittest.TestCase):
+
+    def test_fields(self):
+        self.assertIs(node_kinds[Point], NAMED_TUPLE_KIND)
+        self.assertIs(node_kinds[SubSlotted], VALUE_KIND)  # not walked, unless registered
+        self.assertEqual(slot_names(SubSlotted), ["a", "_Slotted__b", "c", "d"])
+        self.assertEqual(record_fields(Point), ("x", "y"))
+        self.assertEqual(record_fields(Object), None)
+
+    def test_named_tuple(self):
+        obj = {"p": Point(1, {"q": [2]})}
+        self.assertEqual(list(Path.items(obj)), [(("p", "x"), 1), (("p", "y", "q", "0"), 2)])
+        self.assertEqual(WildPath("p.*").get_in(obj), {"x": 1, "y": {"q": [2]}})
+        self.assertEqual(WildPath("p.!x.q").get_in(obj), {"y": [2]})
+        self.assertEqual((Path("p.0").get_in(obj), Path("p.x").get_in(obj)), (1, 1))
+        self.assertEqual(WildPath("p.0|1").get_in({"p": Point(1, 2)}), [1, 2])  # index keys select by index
+        self.assertEqual(WildPath("p.0:1").get_in({"p": Point(1, 2)}), [1])
+        self.assertEqual(list(WildPath("p.!0").iter_in({"p": Point(1, 2)})), [(("p", "1"), 2)])
+        self.assertEqual(flatten([Point(1, 2), Point([3], {"q": 4})]), [1, 2, 3, 4])  # as before: read by index
+        self.assertEqual(WildPath("*.p").get_in([obj], flat=True), [Point(1, {"q": [2]})])  # depth limits flatten
+        WildPath("p.!x.q").set_in(obj, 3)
+        self.assertEqual(obj["p"].y, {"q": 3})
+        with self.assertRaises(AttributeError):
+            WildPath("p.x").set_in(obj, 1)
+
+    def test_slots(self):
+        obj = SubSlotted(1, [2])
+        self.assertEqual(WildPath("*").get_in(obj), {"a": 1, "_Slotted__b": [2], "prop": 0})  # with properties
+        self.assertEqual(WildPath("p*").get_in(obj), {"prop": 0})
+        self.assertEqual(list(Path.items({"s": obj})), [(("s",), obj)])  # a value, unless registered
+        register(Slotted, OBJECT_KIND)
+        try:
+            self.assertEqual(list(Path.items(obj)),  # c and d are empty
+                             [(("a",), 1), (("_Slotted__b", "0"), 2), (("prop",), 0)])
+            WildPath("c|d").set_in(obj, 3)  # not selected: c and d are empty
+            Path("d").set_in(obj, 4)
+            self.assertEqual(WildPath("!_*").get_in(obj), {"a": 1, "d": 4, "prop": 0})
+            WildPath("a|d").del_in(obj)
+            self.assertEqual(list(Path.paths(obj)), [("_Slotted__b", "0"), ("prop",)])
+        finally:
+            node_kinds.unregister(Slotted)
+
+    def test_slotted_values(self):
+        obj = {"id": uuid.UUID(int=1), "ratio": Fraction(1, 3), "path": PurePosixPath("a/b")}
+        self.assertEqual(list(Path.items(obj)), [((k,), v) for k, v in obj.items()])
+        self.assertEqual(WildPath("*").get_in(obj), obj)
+
+    @unittest.skipIf(dataclass is None, "dataclasses are not available")
+    def test_dataclass(self):
+        Record = dataclass(type("Record", (object,), {"__annotations__": {"b": int, "a": list},
+                                                      "__slots__": ("b", "a")}))
+        obj = Record(1, [Point(2, 3)])
+        self.assertEqual(list(Path.items(obj)), [(("b",), 1), (("a", "0", "x"), 2), (("a", "0", "y"), 3)])
+        self.assertEqual(WildPath("a.*.y").get_in(obj), [3])
+        WildPath("*").set_in(obj, 4)
+        self.assertEqual((obj.b, obj.a), (4, 4))
+
+
+if __name__ == "__main__":
+    unittest.main()
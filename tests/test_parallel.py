@@ -0,0 +1,82 @@
+import pickle
+import subprocess
+import sys
+import unittest
+
+from concurrent.futures import ThreadPoolExecutor
+
+from tests.samples import google_route
+from wildpath import Path, WildPath
+from wildpath.parallel import chunked, map_chunks
+
+
+class Counter(object):
+
+    def __init__(self, count):
+        self.count = count
+
+    def add(self, n):
+        self.count += n
+        return self.count
+
+
+def double_all(numbers, factor=2):
+    return [factor * n for n in numbers]
+
+
+class TestParallel(unittest.TestCase):
+
+    records = [{"payload": {"id": i, "items": [{"price": i}, {"price": -i}]}} for i in range(40)]
+
+    def test_chunked(self):
+        self.assertEqual(chunked(list(range(7)), 3), [[0, 1, 2], [3, 4, 5], [6]])
+        self.assertEqual(chunked(list(range(2)), 4), [[0], [1]])
+        self.assertEqual(chunked([], 4), [])
+
+    def test_map_chunks(self):
+        numbers = list(range(100))
+        self.assertEqual(map_chunks(double_all, numbers, 2), double_all(numbers))
+        self.assertEqual(map_chunks(double_all, numbers, 2, 3, threads=True), double_all(numbers, 3))
+        with ThreadPoolExecutor(2) as executor:
+            self.assertEqual(map_chunks(double_all, numbers, executor), double_all(numbers))
+
+    def test_pickle_compiled(self):
+        for path in [Path("routes.0.legs.0.distance"), WildPath("routes.*.legs.*.steps.:2.distance|duration")]:
+            compiled = pickle.loads(pickle.dumps(path.compile()))
+            self.assertEqual(compiled.path, path)
+            self.assertEqual(compiled.get_in(google_route), path.get_in(google_route))
+
+    def test_get_in(self):
+        for path_string in ["*.payload.items.*.price", "*.payload.id", ":3.payload", "*.payload.missing"]:
+            path = WildPath(path_string)
+            self.assertEqual(path.get_in(self.records, None, workers=2), path.get_in(self.records, None))
+            self.assertEqual(path.get_in(self.records, None, flat=True, workers=2),
+                             path.get_in(self.records, None, flat=True))
+        path = WildPath("routes.*.legs.*.steps.*.distance.value")
+        self.assertEqual(path.get_in(google_route, workers=2), path.get_in(google_route))
+        with self.assertRaises(KeyError):
+            WildPath("*.payload.missing").get_in(self.records, workers=2)
+        with self.assertRaises(KeyError):
+            WildPath("missing.*.payload").get_in({"a": []}, workers=2)
+
+    def test_items(self):
+        for kwargs in [{}, {"all": True}, {"max_depth": 2}, {"max_depth": 1, "all": True}]:
+            self.assertEqual(list(Path.items(self.records, workers=2, **kwargs)),
+                             list(Path.items(self.records, **kwargs)))
+        self.assertEqual(list(Path.paths(google_route, workers=2)), list(Path.paths(google_route)))
+        self.assertEqual(list(Path.items(1, workers=2)), [(Path(), 1)])
+
+    def test_call_in(self):
+        counters = [Counter(i) for i in range(20)]
+        self.assertEqual(WildPath("*.add").call_in(counters, 1, workers=2), list(range(1, 21)))
+        self.assertEqual([counter.count for counter in counters], list(range(1, 21)))  # called on the objects
+
+
+class TestImports(unittest.TestCase):
+
+    def test_lazy_imports(self):
+        #  pools, numpy and mmap are only imported when used, so 'import wildpath' stays fast
+        code = "import sys, wildpath; print(sorted({'multiprocessing', 'concurrent.futures', 'numpy', 'mmap'} & " \
+               "set(sys.modules)))"
+        output = subprocess.check_output([sys.executable, "-c", code], universal_newlines=True)
+        self.assertEqual(output.strip(), "[]")
@@ -0,0 +1,105 @@
+import unittest
+
+from collections import namedtuple
+from copy import deepcopy
+
+from tests.samples import google_route, agenda
+from wildpath import Path, WildPath, PathIndex, TrackedDocument
+
+Point = namedtuple("Point", ["x", "y"])
+
+
+class Object(object):
+
+    def __init__(self, **kwargs):
+        for k, v in kwargs.items():
+            setattr(self, k, v)
+
+
+class TestPathIndex(unittest.TestCase):
+
+    path_strings = ["routes.*.legs.*.steps.*.distance.value", "routes.0.legs.0.steps.:3.duration",
+                    "routes.*.legs.*.steps.-1.*_location.lat|lng", "geocoded_waypoints.*.!place_id",
+                    "routes.0.bounds.north*", "status", "*", "routes.0.legs.0.steps.0.html_instructions.0"]
+
+    def test_get_in(self):
+        index = PathIndex(google_route)
+        for path_string in self.path_strings:
+            path = WildPath(path_string)
+            for _ in range(2):  # the second time with the cached selections
+                self.assertEqual(index.get_in(path), path.get_in(google_route))
+                self.assertEqual(index.get_in(path_string, flat=True), path.get_in(google_route, flat=True))
+        self.assertEqual(index.get_in(Path("routes.0.legs.0.distance")), Path("routes.0.legs.0.distance").get_in(
+            google_route))
+        self.assertIs(index.get_in("routes.0.legs"), google_route["routes"][0]["legs"])
+
+    def test_missing(self):
+        index = PathIndex(agenda)
+        self.assertEqual(index.get_in("items.*.missing", default=None), [None, None, None])
+        self.assertEqual(index.get_in("items.9.name", default=0, flat=True), [0])
+        with self.assertRaises(KeyError):
+            index.get_in("items.*.missing")
+        with self.assertRaises(IndexError):
+            index.get_in(Path("items.9"))
+        self.assertTrue(index.has_in("items.*.subjects"))
+        self.assertFalse(index.has_in("items.*.missing"))
+
+    def test_bounded_selections(self):
+        obj = {"k%d" % i: [i] for i in range(200)}
+        index = PathIndex(obj)
+        for i in range(200):  # many different queries
+            self.assertEqual(index.get_in("k%d*.0" % i, flat=True), WildPath("k%d*.0" % i).get_in(obj, flat=True))
+        self.assertEqual(len(index.root.selections), index.root.max_selections)
+        self.assertEqual(index.get_in("k1*.0", flat=True), WildPath("k1*.0").get_in(obj, flat=True))  # selected again
+
+    def test_not_indexed(self):
+        obj = {"a": Object(b=[1, 2], c={"d": 3}), "e": Point(4, [5]), "f": "text"}
+        index = PathIndex(obj)
+        self.assertIsNone(index.root.children["a"].children)
+        for path_string in ["a.b.1", "a.*", "a.c.d", "*.x", "e.y.0", "f.0", "f.:2", "*.*"]:
+            path = WildPath(path_string)
+            self.assertEqual(index.get_in(path, default=None), path.get_in(obj, default=None))
+
+
+class TestTrackedDocument(unittest.TestCase):
+
+    def setUp(self):
+        self.document = TrackedDocument(deepcopy(agenda), verify=True)  # every change is verified
+
+    def test_set_in(self):
+        document = self.document
+        document.set_in("items.*.duration", 5)
+        self.assertEqual(document.get_in("items.*.duration"), [5, 5, 5])
+        document.set_in(Path("items.0.subjects"), ["one", "two"])
+        self.assertEqual(document.get_in("items.*.subjects.0"), ["one", "milestones", "questions"])
+        document.set_in("new", {"a": [1, 2]})
+        self.assertEqual(document.get_in("new.a.-1"), 2)
+        self.assertIs(document.obj["new"], document.get_in("new"))
+
+    def test_del_pop_in(self):
+        document = self.document
+        self.assertEqual(document.pop_in("items.0:2.subjects"),
+                         [["purpose of the meeting"], ["milestones", "project delays", "actions"]])
+        self.assertFalse(document.has_in("items.0.subjects"))
+        self.assertEqual(document.get_in("items.*.subjects", default=None), [None, None, ["questions", "roundup"]])
+        document.del_in("items.-1")
+        self.assertEqual(document.get_in("items.*.name"), ["opening", "progress"])
+        document.del_in("item*")
+        self.assertEqual(list(document.get_in("*")), ["meeting", "date", "start_time", "end_time", "invited"])
+
+    def test_shared_containers(self):
+        document = self.document
+        shared = {"value": 1}
+        for index in range(3):  # the same dict at three locations
+            document.set_in(Path("items.%d.shared" % index), shared)
+        document.set_in("items.0.shared.value", 2)
+        self.assertEqual(document.get_in("items.*.shared.value"), [2, 2, 2])
+        document.del_in("items.1.shared.value")
+        self.assertEqual(document.get_in("items.*.shared.*"), [{}, {}, {}])
+
+    def test_verify(self):
+        document = TrackedDocument(deepcopy(agenda))
+        document.verify()
+        document.obj["items"].append({"name": "untracked"})  # changed without updating the index
+        with self.assertRaises(AssertionError):
+            document.verify()
@@ -1,11 +1,14 @@
+import sys
 import unittest
 
 from copy import deepcopy
+from fnmatch import fnmatchcase
 
 from tests.samples import agenda
 from tests.samples import google_route
 from wildpath import Path, WildPath
-from wildpath.keyparser import KeyParser
+from wildpath.tools import flatten
+from wildpath.keyparser import KeyParser, compile_glob
 
 
 class Object(object):
@@ -165,6 +168,37 @@ class TestPath(TestBase):
         self.assertEqual(Path("1").get_in(obj), 3)
         self.assertEqual(Path("value.1").get_in(obj), "c")
 
+    def test_from_parts(self):
+        path = Path.from_parts(["a", "b.c"])
+        self.assertEqual(path, ("a", "b.c"))
+        self.assertEqual(type(path), Path)
+        self.assertEqual(type(WildPath.from_parts(("a", "*"))), WildPath)
+        self.assertEqual(WildPath.from_parts(("a", "*")).get_in({"a": {"b": 1}}), {"b": 1})
+
+    def test_intern(self):
+        path = Path.intern("a.b.c")
+        self.assertIs(Path.intern("a.b.c"), path)
+        self.assertEqual(path, Path("a.b.c"))
+        self.assertIs(type(WildPath.intern("a.b.c")), WildPath)
+        self.assertIs(WildPath.intern("a.*"), WildPath.intern("a.*"))
+        self.assertEqual(str(path), "a.b.c")
+        self.assertIs(str(path), str(path))  # cached
+
+    def test_get_many(self):
+        records = [{"a": [i, {"b": i}]} for i in range(5)] + [{"a": (5, Object(b=5))}]
+        path = Path("a.1.b")
+        self.assertEqual(path.get_many(records), [0, 1, 2, 3, 4, 5])
+        self.assertEqual(path.get_many(records, column=True), [0, 1, 2, 3, 4, 5])
+        self.assertEqual(list(path.iter_many(iter(records))), [0, 1, 2, 3, 4, 5])
+        self.assertEqual(path.get_many([{}, records[1]], default=None), [None, 1])
+        with self.assertRaises(KeyError):
+            path.get_many([records[0], {}])
+
+    def test_no_instance_dict(self):
+        self.assertFalse(hasattr(WildPath("a.*"), "__dict__"))
+        self.assertEqual(WildPath("a.*.b.!c").depth, 1)
+        self.assertEqual(WildPath("a.b").depth, -1)
+
 
 class TestWildPath(TestBase):
 
@@ -429,6 +463,43 @@ class TestWildPath(TestBase):
         path = WildPath("f.*.*.*")
         self.assertTrue(all(isinstance(p, list) for p in path.get_in(obj, flat=True)))
 
+    def test_flat_iter(self):
+        obj = deepcopy(self.simple)
+        for path_string in ["f.*.*.*.1", "f.*.*.*", "f.1.*", "e.*.b|c", "f.*.0.b.*", "c"]:
+            path = WildPath(path_string)
+            values = path.get_in(obj, flat_iter=True)
+            self.assertFalse(isinstance(values, list))
+            self.assertEqual(list(values), flatten(path.get_in(obj), depth=path.depth))
+        for path_string in ["f.*.*.x", "x.*", "x"]:
+            path = WildPath(path_string)
+            self.assertEqual(list(path.iter_flat_in(obj, [0, 1])), path.get_in(obj, [0, 1], flat=True))
+        with self.assertRaises(KeyError):
+            list(WildPath("f.*.*.x").iter_flat_in(obj))
+
+    def test_get_many(self):
+        records = [{"x_time": i, "y_time": -i, "z": [i, i]} for i in range(3)]
+        path = WildPath("*_time")
+        self.assertEqual(path.get_many(records), [path.get_in(record) for record in records])
+        self.assertEqual(path.get_many(records, flat=True), [[0, 0], [1, -1], [2, -2]])
+        self.assertEqual(path.get_many(records, column=True), [0, 0, 1, -1, 2, -2])
+        self.assertEqual(list(WildPath("z|x_time").iter_many(records, column=True)), [[0, 0], 0, [1, 1], 1, [2, 2], 2])
+        self.assertEqual(WildPath("z.*").get_many(records + [{}], default=[], column=True), [0, 0, 1, 1, 2, 2])
+        self.assertEqual(WildPath("a").get_many([{}, {"a": 1}], default=None), [None, 1])
+        results = path.iter_many(iter(records))
+        self.assertEqual(next(results), {"x_time": 0, "y_time": 0})
+
+    def test_iter_in(self):
+        obj = deepcopy(self.simple)
+        for path_string in ["f.*.*.*.1", "e.0|1.b", "e.*.a|c", "c.*", "f.!0.1.c.::2", "b.0", "a.*"]:
+            path = WildPath(path_string)
+            items = list(path.iter_in(obj))
+            self.assertTrue(all(type(p) is Path and p.get_in(obj) == v for p, v in items))
+            self.assertEqual([v for _, v in items], path.get_in(obj, flat=True) if path.depth >= 0 else [obj.b[0]])
+        self.assertEqual(list(WildPath("e.*.d").iter_in(obj)), [])
+        self.assertEqual([v for _, v in WildPath("e.*.b").iter_in(obj)], [8, 9])  # skips e.2, which has no 'b'
+        items = WildPath("f.*.*.*").iter_in(obj)
+        self.assertEqual(next(items), (Path("f.0.0.a"), [7, 7]))
+
     def test_call_in(self):
         special = Object(s=0)
         special.sub = lambda x, y: x-y
@@ -476,6 +547,55 @@ class TestIterators(TestBase):
         self.assertEqual(simple, self.simple)
 
 
+    def test_iteritems_breadth_first(self):
+        obj = {"a": [1, {"b": 2}], "c": 3, "d": {"e": [4]}}
+        self.assertEqual([str(p) for p in Path.paths(obj, breadth_first=True)], ["c", "a.0", "a.1.b", "d.e.0"])
+        self.assertEqual([str(p) for p in Path.paths(obj, all=True, breadth_first=True)],
+                         ["a", "c", "d", "a.0", "a.1", "d.e", "a.1.b", "d.e.0"])
+        self.assertEqual(sorted(Path.items(self.simple, breadth_first=True)), sorted(Path.items(self.simple)))
+
+    def test_iteritems_max_depth(self):
+        obj = {"a": [1, {"b": 2}], "c": 3}
+        self.assertEqual(list(Path.items(obj, max_depth=1)), [(Path("a"), [1, {"b": 2}]), (Path("c"), 3)])
+        self.assertEqual(list(Path.paths(obj, all=True, max_depth=2)), [Path("a"), Path("a.0"), Path("a.1"), Path("c")])
+        self.assertEqual(list(Path.values(obj, max_depth=0)), [obj])
+
+    def test_iteritems_match(self):
+        for obj, path_strings in [(self.agenda, ["items.*.subjects.0|2", "*_time", "items.!1.*", "items.1::-1"]),
+                                  (self.google_route, ["routes.*.legs.*.steps.*.*_location"]),
+                                  (self.simple, ["e.*.b", "f.*.1.c", "d.*", "*"])]:
+            for path_string in path_strings:
+                length = len(WildPath(path_string))
+                prefixes = [path for path, _ in WildPath(path_string).iter_in(obj)]
+                for all_items in (False, True):
+                    items = [(path, value) for path, value in Path.items(obj, all=all_items)
+                             if path[:length] in prefixes]
+                    self.assertEqual(list(Path.items(obj, all=all_items, match=WildPath(path_string))), items)
+        self.assertEqual(list(Path.paths(self.agenda, match="invited.-1")), [Path("invited.2")])
+        self.assertEqual(list(Path.values(self.agenda, match="items.*.name", breadth_first=True)),
+                         ["opening", "progress", "closing"])
+
+    def test_iteritems_match_pruned(self):
+        class CountingDict(dict):
+            iterated = 0
+
+            def items(self):
+                CountingDict.iterated += 1
+                return super(CountingDict, self).items()
+
+        obj = {"a": [CountingDict(x=1)] * 10, "b": CountingDict(y=2, z=3)}
+        self.assertEqual(list(Path.values(obj, match="b.y|z")), [2, 3])
+        self.assertEqual(CountingDict.iterated, 1)
+
+    def test_iteritems_deep(self):
+        obj = value = {}
+        for _ in range(3 * sys.getrecursionlimit()):
+            value["a"] = value = {}
+        value["b"] = 1
+        (path, value), = Path.items(obj)
+        self.assertEqual((len(path), value), (3 * sys.getrecursionlimit() + 1, 1))
+
+
 class TestKeyParser(unittest.TestCase):
     
     def setUp(self):
@@ -615,6 +735,73 @@ class TestKeyParser(unittest.TestCase):
                 expression(*keys),
                 expected))
 
+    def test_keys_in(self):
+        mapping = dict.fromkeys(["a", "b", "c", "aa", "ab", "ac", "bb", "bc", "cc", "a b"])
+        for wildkey in ["a", "!a", "a|b", "c|a|zz|a", "a*", "!a*", "a|!b", "a&!b", "!(a|b)", "!(a&b)", "b*|c*",
+                        "b*&*c", "a&a*", "a*&a", "zz", "zz|yy", "(a|bb)&!a*", "a?|c", "*", "!*"]:
+            expression = self.keyparser.parse(wildkey, simplify=True)
+            self.assertEqual(expression.keys_in(mapping), expression(*mapping), msg=wildkey)
+
+    def test_literal_keys_in(self):
+        class CountingDict(dict):
+            iterated = 0
+
+            def __iter__(self):
+                for key in super(CountingDict, self).__iter__():
+                    self.iterated += 1
+                    yield key
+
+        mapping = CountingDict((str(i), i) for i in range(10000))
+        for wildkey, expected in [("12", ["12"]), ("3|2|x|1", ["3", "2", "1"]), ("12&!1*", []), ("22&!1*", ["22"])]:
+            expression = self.keyparser.parse(wildkey, simplify=True)
+            mapping.iterated = 0
+            self.assertEqual(expression.keys_in(mapping), expected)
+            self.assertLess(mapping.iterated, 5)  # only to check the type of the keys
+
+    def test_compile_glob(self):
+        keys = ["a", "ab", "ba", "bab", "a_location", "start_time", "*", "a*b", "[a]", "", "A"]
+        for glob in ["a", "a*", "*a", "*a*", "*", "**", "a?", "[ab]*", "*_location", "a*b", "[[]*", "*[*]*"]:
+            match = compile_glob(glob)
+            self.assertEqual([k for k in keys if match(k)], [k for k in keys if fnmatchcase(k, glob)])
+
+    def test_glob_or(self):
+        keys = ["x_time", "a_location", "b_time", "b_location", "c", "time_location", "x"]
+        mapping = dict.fromkeys(keys)
+        for wildkey in ["*_location|*_time", "*_time|*_location", "?_*|*_location|x", "c*|*n|[bx]*"]:
+            expression = self.keyparser.parse(wildkey, simplify=False)
+            expected = []
+            for glob in wildkey.split("|"):
+                expected.extend(k for k in keys if fnmatchcase(k, glob) and k not in expected)
+            self.assertEqual(expression(*keys), expected)
+            self.assertEqual(expression.keys_in(mapping), expected)
+
+    def test_order(self):
+        keys = ["b%d" % i for i in range(50)] + ["a%d" % i for i in range(50)]
+        for wildkey, expected in [("a1*|b1*|a1*", [k for k in keys if k.startswith("a1")] +
+                                                 [k for k in keys if k.startswith("b1")]),
+                                  ("*1&!a*", [k for k in keys if k.endswith("1") and k[0] == "b"]),
+                                  ("!*1", [k for k in keys if not k.endswith("1")])]:
+            expression = self.keyparser.parse(wildkey, simplify=False)
+            self.assertEqual(expression(*keys), expected)
+            self.assertEqual(expression.keys_in(dict.fromkeys(keys)), expected)
+        expression = self.keyparser.parse("-1|::3|1&!0", simplify=False)
+        self.assertEqual(expression(*range(10)), [9, 0, 3, 6, 1])
+
+    def test_indices(self):
+        for wildkey in ["0", "-1", "-7", "12", "*", ":", "1:", "::-2", "-3:", "0|-1", "-1|0|-1", "!0", "!1:4",
+                        "!::2", "!5:2:-1", "1:&!3", "::2&1::3", "-1:&:3", "::-1&1|2", "!(0|4)&::-1"]:
+            expression = self.keyparser.parse(wildkey, simplify=False)
+            for length in [0, 1, 2, 5, 10]:
+                self.assertEqual(list(expression.indices(length)), expression(*range(length)))
+        self.assertEqual(self.keyparser.parse("0|-1").indices(10 ** 12), [0, 10 ** 12 - 1])
+        self.assertEqual(self.keyparser.parse("::-1&:3").indices(10 ** 12), [2, 1, 0])
+        with self.assertRaises(ValueError):
+            self.keyparser.parse("a*|1").indices(10)
+
+    def test_slice_on_str_keys(self):
+        with self.assertRaises(TypeError):
+            WildPath("1:3").get_in({"a": 1})
+
 
 class TestLogicPath(TestBase):
 
@@ -664,6 +851,18 @@ class TestLogicPath(TestBase):
         path = WildPath("!(::2|::3)")
         self.assertEqual(path.get_in(obj), [1,5,7])
 
+    def test_nested_or(self):
+        obj = dict(ax=1, bx=2, c=3, cy=4, d=5)
+        self.assertEqual(WildPath("(a*|b*)|c*").get_in(obj), dict(ax=1, bx=2, c=3, cy=4))  # glob alternative
+        self.assertEqual(WildPath("(a*|b*)|c").get_in(obj), dict(ax=1, bx=2, c=3))  # literal alternative
+        self.assertEqual(list(WildPath("c|(b*|a*)").get_in(obj)), ["c", "bx", "ax"])
+
+    def test_slice_and_not(self):
+        obj = list(range(8))
+        self.assertEqual(WildPath("1:&!3").get_in(obj), [1,2,4,5,6,7])  # slices are hashable symbols
+        self.assertEqual(WildPath("1:&!(3|5:)").get_in(obj), [1,2,4])
+        self.assertEqual(WildPath("!1:3&!1:3").get_in(obj), [0,3,4,5,6,7])
+
     def test_composite_path(self):
         obj = deepcopy(self.agenda)
         path = WildPath("items.0|2.?u*&!*ion.!1:")  # last key: second char == 'u' and ends with 'ion'
@@ -0,0 +1,77 @@
+import unittest
+
+from copy import deepcopy
+
+from tests.samples import agenda, google_route
+from wildpath import Path, WildPath, PathSet
+
+
+class Object(object):
+
+    def __init__(self, **kwargs):
+        for k, v in kwargs.items():
+            setattr(self, k, v)
+
+
+class TestPathSet(unittest.TestCase):
+
+    def setUp(self):
+        self.agenda = deepcopy(agenda)
+
+    def test_get_in(self):
+        path_strings = ["routes.0.legs.0.distance.text", "routes.0.legs.0.duration.value", "routes.0.summary",
+                        "routes.0.legs.0.steps.*.distance.value", "routes.0.legs.0.steps.-1.end_location.lat",
+                        "routes.0.legs.0", "status", "routes.*.summary", "*"]
+        results = PathSet(path_strings).get_in(google_route)
+        self.assertEqual(list(results), path_strings)
+        for path_string in path_strings:
+            self.assertEqual(results[path_string], WildPath(path_string).get_in(google_route))
+
+    def test_path_types(self):
+        path_set = PathSet([Path("items.0.name"), WildPath("items.*.name"), "items.1.subjects.-1"])
+        self.assertEqual(list(path_set.get_in(self.agenda).values()),
+                         ["opening", ["opening", "progress", "closing"], "actions"])
+        self.assertEqual(len(path_set), 3)
+        self.assertIn(Path("items.0.name"), path_set)
+
+    def test_objects(self):
+        obj = Object(a=Object(b=[1, 2], c={"d": 3}), e=(4, 5))
+        results = PathSet(["a.b.1", "a.c.d", "e.0", "a.!b.d"]).get_in(obj)
+        self.assertEqual(list(results.values()), [2, 3, 4, {"c": 3}])
+
+    def test_defaults(self):
+        path_set = PathSet({"items.0.name": None, "items.5.name": "none", "x.y": 1, "items.*.x": "-"})
+        self.assertEqual(list(path_set.get_in(self.agenda).values()), ["opening", "none", 1, ["-", "-", "-"]])
+        path_set = PathSet(["items.5.name", "items.5.duration", "x.*"], default=0)
+        self.assertEqual(list(path_set.get_in(self.agenda).values()), [0, 0, 0])
+        with self.assertRaises(IndexError):
+            PathSet(["items.0.name", "items.5.name"]).get_in(self.agenda)
+        with self.assertRaises(KeyError):
+            PathSet(["items.*.x"]).get_in(self.agenda)
+
+    def test_changing_types(self):
+        path_set = PathSet(["a.1", "a.x"], default=None)
+        self.assertEqual(list(path_set.get_in({"a": [0, 1]}).values()), [1, None])
+        self.assertEqual(list(path_set.get_in({"a": {"1": 2, "x": 3}}).values()), [2, 3])
+        self.assertEqual(list(path_set.get_in(Object(a=Object(x=4))).values()), [None, 4])
+
+    def test_flat(self):
+        path_strings = ["routes.*.legs.*.steps.*.distance.value", "routes.0.legs.0.steps.:2.duration", "status",
+                        "missing.*.value"]
+        results = PathSet(path_strings, default=None).get_in(google_route, flat=True)
+        for path_string in path_strings:
+            if path_string != "status":
+                self.assertEqual(results[path_string], WildPath(path_string).get_in(google_route, None, flat=True))
+        self.assertEqual(results["status"], "OK")  # not a wild path
+
+    def test_flat_without_wild_keys(self):
+        paths = [WildPath("status"), WildPath("missing.value")]
+        results = PathSet(paths, default=None).get_in(google_route, flat=True)
+        for path in paths:
+            self.assertEqual(results[path], path.get_in(google_route, None, flat=True))
+        self.assertEqual(results[WildPath("status")], ["OK"])
+        self.assertEqual(PathSet([Path("status")]).get_in(google_route, flat=True), {Path("status"): "OK"})
+
+
+if __name__ == "__main__":
+    unittest.main()
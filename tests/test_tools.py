@@ -1,10 +1,24 @@
 import unittest
 
-from wildpath.tools import flatten
+from wildpath.tools import flatten, iter_flatten, dedoubled
 
 
 class TestTools(unittest.TestCase):
 
     def test_flatten_string_items(self):
         L = [["a", "b"], ["c", "d"], ["e", "f", "g"]]
-        self.assertEqual(flatten(L, depth=1), ['a', 'b', 'c', 'd', 'e', 'f', 'g'])
\ No newline at end of file
+        self.assertEqual(flatten(L, depth=1), ['a', 'b', 'c', 'd', 'e', 'f', 'g'])
+
+    def test_dedoubled(self):
+        self.assertEqual(dedoubled([3, 1, 3, 2, 1]), [3, 1, 2])
+        self.assertEqual(dedoubled(iter("abcba")), ["a", "b", "c"])
+        self.assertEqual(dedoubled([[1], [2], [1]]), [[1], [2]])  # unhashable items
+
+    def test_iter_flatten(self):
+        L = [{"a": [1, (2, "bc")], "d": 3}, [[4]], 5]
+        self.assertEqual(list(iter_flatten(L)), [1, 2, "bc", 3, 4, 5])
+        self.assertEqual(list(iter_flatten(L, depth=1)), [[1, (2, "bc")], 3, [4], 5])
+        deep = [1]
+        for _ in range(10000):
+            deep = [deep]
+        self.assertEqual(flatten(deep), [1])
@@ -1,3 +1,6 @@
 from wildpath.paths import Path, WildPath
+from wildpath.pathset import PathSet
+from wildpath.pathindex import PathIndex, TrackedDocument
+from wildpath.jsonl import scan_jsonl
 
-__all__ = ["Path", "WildPath"]
\ No newline at end of file
+__all__ = ["Path", "WildPath", "PathSet", "PathIndex", "TrackedDocument", "scan_jsonl"]
\ No newline at end of file
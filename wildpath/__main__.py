@@ -0,0 +1,5 @@
+import sys
+
+from wildpath.cli import main
+
+sys.exit(main())
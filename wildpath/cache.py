@@ -0,0 +1,97 @@
+from collections import OrderedDict, namedtuple
+from threading import Lock
+
+__author__ = "Lars van Gemerden"
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+_missing = object()
+
+
+class LRUCache(object):
+    """
+    Thread-safe mapping with a maximum size; when it is full, the least recently used item is discarded.
+
+    All access goes through a lock, so the cache is also safe to share between threads on free-threaded
+    builds of python. 'get_or_create' creates missing values outside of the lock, so a slow factory does
+    not block other threads; if two threads create the same value, the first one stored is kept.
+    """
+
+    def __init__(self, maxsize=4096):
+        if maxsize is not None and maxsize < 0:
+            raise ValueError("maxsize cannot be negative")
+        self.maxsize = maxsize  # None means unbounded
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._data
+
+    def __getitem__(self, key):
+        value = self.get(key, _missing)
+        if value is _missing:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            self._trim()
+
+    def __delitem__(self, key):
+        with self._lock:
+            del self._data[key]
+
+    def _trim(self):
+        data, maxsize = self._data, self.maxsize
+        if maxsize is not None:
+            while len(data) > maxsize:
+                data.popitem(last=False)
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def get_or_create(self, key, factory):
+        """ returns the value for 'key', calling factory(key) and storing the result if it is missing """
+        value = self.get(key, _missing)
+        if value is _missing:
+            value = factory(key)
+            with self._lock:
+                value = self._data.setdefault(key, value)
+                self._data.move_to_end(key)
+                self._trim()
+        return value
+
+    def resize(self, maxsize):
+        """ changes the maximum size, discarding the least recently used items if needed """
+        if maxsize is not None and maxsize < 0:
+            raise ValueError("maxsize cannot be negative")
+        with self._lock:
+            self.maxsize = maxsize
+            self._trim()
+
+    def clear(self):
+        """ removes all items and resets the statistics """
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def cache_info(self):
+        """ returns (hits, misses, maxsize, currsize), like functools.lru_cache """
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self._data))
@@ -0,0 +1,97 @@
+"""
+Command line tool to apply paths to JSON documents and JSON Lines, e.g.:
+
+    python -m wildpath "routes.*.legs.*.distance.value" -f route.json
+    cat events.jsonl | wildpath --lines --jsonl id "payload.items.*.price" --workers 4
+"""
+import argparse
+import json
+import sys
+
+from wildpath.jsonl import scan_jsonl, iter_jsonl
+from wildpath.jsonstream import iter_flat_json, in_document_order
+from wildpath.paths import WildPath
+from wildpath.pathset import PathSet
+from wildpath.tools import _marker
+
+__author__ = "Lars van Gemerden"
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="wildpath", description="Applies paths (e.g. 'a.*.b') to JSON documents, "
+                                                                  "or to every line of JSON Lines input.")
+    parser.add_argument("paths", nargs="+", metavar="PATH",
+                        help="Path or WildPath; with more than one path, the results are objects {path: value}")
+    parser.add_argument("-f", "--file", action="append", dest="files", metavar="FILE",
+                        help="input file (can be repeated); by default the input is read from stdin")
+    parser.add_argument("-l", "--lines", action="store_true", help="the input is JSON Lines: one document per line")
+    parser.add_argument("--flat", action="store_true", help="the results of wild paths are flat lists of values")
+    parser.add_argument("--jsonl", action="store_true",
+                        help="write each result as JSON on a single line; with --flat and one path, each value")
+    parser.add_argument("-d", "--default", type=json.loads, default=_marker, metavar="JSON",
+                        help="value (as JSON, e.g. null) for missing items; without it, missing items are an error")
+    parser.add_argument("-w", "--workers", type=int, metavar="N", help="number of worker processes (with --lines)")
+    parser.add_argument("--unordered", action="store_true",
+                        help="with --workers, write the results as they are ready instead of in the input order")
+    args = parser.parse_args(argv)
+    if args.workers is not None and not args.lines:
+        parser.error("--workers can only be used with --lines")
+    return args
+
+
+def iter_results(args, fp, filename=None):
+    """
+    yields the results for an input file: the value with one path or {path: value} with more paths; with
+    --jsonl, --flat and one path, the values in the results
+    """
+    paths, default, flat = args.paths, args.default, args.flat
+    single = len(paths) == 1
+    split_values = args.jsonl and flat and single
+    if args.lines:
+        if filename is not None:
+            results = scan_jsonl(filename, paths, args.workers, not args.unordered, default, flat)
+        else:
+            results = iter_jsonl(fp, paths, args.workers, not args.unordered, default, flat)
+    elif single and flat and isinstance(PathSet._as_path(paths[0]), WildPath) and in_document_order(WildPath(paths[0])):
+        #  the values are found while reading the document, with the default for missing items (or an error)
+        values = iter_flat_json(fp, PathSet._as_path(paths[0]), default)
+        results = [{paths[0]: values if split_values else list(values)}]
+    else:
+        results = [PathSet(paths, default).get_in(json.load(fp), flat)]
+    for result in results:
+        if split_values:
+            for value in result[paths[0]]:
+                yield value
+        elif single:
+            yield result[paths[0]]
+        else:
+            yield result
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.jsonl:
+        dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+    else:
+        dumps = json.JSONEncoder(ensure_ascii=False, indent=2).encode
+    write = sys.stdout.write
+    try:
+        for filename in args.files or [None]:
+            if filename is None:
+                fp = sys.stdin.buffer
+            else:
+                fp = open(filename, "rb")
+            try:
+                for result in iter_results(args, fp, filename):
+                    write(dumps(result) + "\n")
+            finally:
+                if filename is not None:
+                    fp.close()
+        sys.stdout.flush()
+    except BrokenPipeError:  # e.g. piped into 'head'
+        sys.stderr.close()
+        return 1
+    except (KeyError, IndexError, AttributeError, TypeError, ValueError, OSError) as error:
+        sys.stderr.write("wildpath: error: %s\n" % (error,))
+        return 1
+    return 0
@@ -0,0 +1,51 @@
+from array import array
+from collections import namedtuple
+
+__author__ = "Lars van Gemerden"
+
+MaskedArray = namedtuple("MaskedArray", ["data", "mask"])  # used when numpy is not installed
+
+_missing = object()
+
+_typecodes = {float: "d", int: "q", bool: "B"}  # for array.array, when a python type is given as dtype
+
+
+def _filled(values, missing, fill_value):
+    """ yields the values, with 'fill_value' in place of missing values (and None), recording their positions """
+    for i, value in enumerate(values):
+        if value is _missing or value is None:
+            missing.append(i)
+            yield fill_value
+        else:
+            yield value
+
+
+def import_numpy():
+    """ returns the numpy module, or None if it is not installed; imported when used, since it is slow to import """
+    try:
+        import numpy
+    except ImportError:  # numpy is optional: arrays are built with array.array instead
+        return None
+    return numpy
+
+
+def build_array(values, dtype="d", fill_value=0):
+    """
+    Returns the iterable 'values' as a masked array: with numpy a numpy.ma.MaskedArray, otherwise a
+    MaskedArray(data, mask) of two array.array's (the mask with typecode "B"). The values are written into the
+    array as they are produced, without a list in between. Missing values (and None) are masked and stored as
+    'fill_value'.
+    """
+    missing = []
+    numpy = import_numpy()
+    if numpy is not None:
+        data = numpy.fromiter(_filled(values, missing, fill_value), dtype=dtype)
+        mask = numpy.zeros(len(data), dtype=bool)
+        mask[missing] = True
+        return numpy.ma.MaskedArray(data, mask=mask)
+    data = array(_typecodes.get(dtype, dtype), _filled(values, missing, fill_value))
+    mask = array("B", bytes(len(data)))
+    for i in missing:
+        mask[i] = 1
+    return MaskedArray(data, mask)
+
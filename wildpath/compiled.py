@@ -0,0 +1,571 @@
+from itertools import chain
+from operator import itemgetter, attrgetter
+
+from wildpath.keyparser import WildSymbol
+from wildpath.parallel import map_chunks
+from wildpath.nodes import node_kinds, object_schemas, LEAF, MAPPING, SEQUENCE, METHOD
+from wildpath.tools import iter_flatten, _marker
+
+__author__ = "Lars van Gemerden"
+
+
+def _as_index(key):
+    try:
+        return int(key)
+    except ValueError:
+        return None
+
+
+def _attr_getter(key):
+    if "." in key:  # attrgetter would follow a dotted key as a chain of attributes
+        return lambda obj: getattr(obj, key)
+    return attrgetter(key)
+
+
+def _compile(path_class, keys):
+    """ recreates a compiled path from the class and keys of the path (e.g. after pickling) """
+    return path_class.from_parts(keys).compile()
+
+
+class CompiledPath(object):
+    """
+    Reusable accessor for a Path, returned by Path.compile().
+
+    Keys are converted to indices once. Every step keeps an inline cache of the concrete type it saw
+    last, together with a getter specialized for that type; as long as the same type keeps showing up,
+    a step costs one type check and one call. Other types fall back to the generic logic of Path, after
+    which the step is re-specialized for the new type.
+    """
+
+    __slots__ = ("path", "_keys", "_indices", "_caches", "_last_cache")
+
+    def __init__(self, path):
+        self.path = path
+        self._keys = tuple(path)
+        self._indices = tuple(_as_index(key) for key in path)
+        self._caches = [(None, None)] * len(path)  # (type, getter) for each step
+        self._last_cache = (None, None)  # (type, item key or index) for set_in and del_in
+
+    def __repr__(self):
+        return "%s(%r)" % (self.__class__.__name__, self.path)
+
+    def __reduce__(self):
+        return _compile, (self.path.__class__, tuple(self.path))
+
+    def _specialize(self, i, obj):
+        """ generic lookup for step i, caching a getter for the type of 'obj' """
+        key, index = self._keys[i], self._indices[i]
+        read = node_kinds[type(obj)].read
+        if read == MAPPING:
+            getter = itemgetter(key)
+        elif read == SEQUENCE and index is not None:
+            getter = itemgetter(index)
+        else:
+            getter = _attr_getter(key)
+        self._caches[i] = (type(obj), getter)
+        return getter(obj)
+
+    def _specialize_last(self, obj):
+        """ returns the item key or index to set or delete in 'obj', or None for an attribute """
+        write = node_kinds[type(obj)].write
+        if write == MAPPING:
+            target = self._keys[-1]
+        elif write == SEQUENCE:
+            target = self._indices[-1]
+        else:
+            target = None
+        self._last_cache = (type(obj), target)
+        return target
+
+    def _get_parent(self, obj):
+        caches = self._caches
+        for i in range(len(caches) - 1):
+            cached_type, getter = caches[i]
+            if type(obj) is cached_type:
+                obj = getter(obj)
+            else:
+                obj = self._specialize(i, obj)
+        return obj
+
+    def _get_target(self, obj):
+        cached_type, target = self._last_cache
+        if type(obj) is cached_type:
+            return target
+        return self._specialize_last(obj)
+
+    def get_in(self, obj, default=_marker):
+        """returns item at the path from the 'obj'"""
+        try:
+            for i, (cached_type, getter) in enumerate(self._caches):
+                if type(obj) is cached_type:
+                    obj = getter(obj)
+                else:
+                    obj = self._specialize(i, obj)
+        except (KeyError, IndexError, AttributeError):
+            if default is _marker:
+                raise
+            return default
+        return obj
+
+    def iter_many(self, records, default=_marker):
+        """ yields get_in(record, default) for all records """
+        caches, specialize = self._caches, self._specialize
+        for obj in records:
+            try:
+                for i, (cached_type, getter) in enumerate(caches):
+                    if type(obj) is cached_type:
+                        obj = getter(obj)
+                    else:
+                        obj = specialize(i, obj)
+            except (KeyError, IndexError, AttributeError):
+                if default is _marker:
+                    raise
+                obj = default
+            yield obj
+
+    def set_in(self, obj, value):
+        """sets item at the path in the 'obj' to 'value'"""
+        obj = self._get_parent(obj)
+        target = self._get_target(obj)
+        if target is None:
+            setattr(obj, self._keys[-1], value)
+        else:
+            obj[target] = value
+
+    def del_in(self, obj):
+        """deletes item at the path from the 'obj'"""
+        obj = self._get_parent(obj)
+        target = self._get_target(obj)
+        if target is None:
+            delattr(obj, self._keys[-1])
+        else:
+            del obj[target]
+
+    def pop_in(self, obj):
+        result = self.get_in(obj)
+        self.del_in(obj)
+        return result
+
+    def has_in(self, obj):
+        """checks presence of item at the path in the 'obj'"""
+        try:
+            self.get_in(obj)
+        except (KeyError, IndexError, AttributeError):
+            return False
+        return True
+
+    def call_in(self, obj, *args, **kwargs):
+        return self.get_in(obj)(*args, **kwargs)
+
+
+class _Attributes(object):
+    """
+    Read-only mapping of the attributes of an object that are not methods, used to select attributes with wild
+    keys; the attributes themselves are only looked up for the names that are selected.
+    """
+
+    __slots__ = ("obj", "names")
+
+    def __init__(self, obj):
+        schema = object_schemas[obj.__class__]
+        kinds = schema.kinds
+        self.obj = obj
+        self.names = dict.fromkeys(name for name in schema.attribute_names(obj) if kinds.get(name) != METHOD)
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self.names
+
+    def __getitem__(self, name):
+        return getattr(self.obj, name)
+
+
+def _wild_indices(expr, seq):
+    """ returns the indices selected by 'expr' in 'seq', or None if 'expr' does not select indices """
+    try:
+        return expr.indices(len(seq))
+    except ValueError:
+        return None
+
+
+def _select_indices(expr, obj, kind):
+    """
+    returns the indices selected by 'expr' in 'obj', or None if 'expr' selects attributes: for objects that are
+    not read by index, for keys that are not indices (e.g. "a*") and for "*" on namedtuples, which selects fields
+    """
+    if kind.select != SEQUENCE and (kind.read != SEQUENCE or getattr(expr, "obj", None) is WildSymbol.ALL):
+        return None
+    return _wild_indices(expr, obj)
+
+
+def _get_with_key(value, k):
+    if node_kinds[type(value)].read == MAPPING:
+        return value[k]
+    return value
+
+
+def _get_with_index(value, index):
+    kind = node_kinds[type(value)]
+    if kind.read == SEQUENCE and kind.walk != LEAF:
+        return value[index]
+    return value
+
+
+def _flat_values(result, depth):
+    """ returns the values of flatten(result, depth) as an iterable """
+    if depth == 0:  # the values of a path with one wild key: no nested lists or dicts to create iterators for
+        walk = node_kinds[type(result)].walk
+        if walk == MAPPING:
+            return result.values()
+        if walk == SEQUENCE:
+            return result
+    return iter_flatten(result, depth)
+
+
+def _select_children(expr, obj, node_kinds=node_kinds):
+    """ returns the (empty) result for the items of 'obj' selected by 'expr', the slots in it and the items """
+    kind = node_kinds[type(obj)]
+    if kind.select == MAPPING:
+        keys = expr.keys_in(obj)
+        return dict.fromkeys(keys), keys, [obj[k] for k in keys]
+    indices = _select_indices(expr, obj, kind)
+    if indices is None:
+        attributes = _Attributes(obj)
+        keys = expr.keys_in(attributes)
+        return dict.fromkeys(keys), keys, [attributes[k] for k in keys]
+    return [None] * len(indices), range(len(indices)), [obj[index] for index in indices]
+
+
+def _get_chunk(children, compiled, has_default, default):
+    """ evaluates a compiled path on a chunk of items, in a worker """
+    get_in, default = compiled._get_in, default if has_default else _marker  # _marker does not survive pickling
+    return [get_in(child, default) for child in children]
+
+
+_skip = object()  # default for _iter_in to skip items that are not present
+
+
+def _iter_children(keys, container, selected, names, i):
+    """ yields the (keys, child, step) items for the 'selected' keys or indices of 'container' """
+    for k, name in zip(selected, names):
+        yield keys + (name,), container[k], i
+
+
+class CompiledWildPath(object):
+    """
+    Evaluation plan for a WildPath, returned by WildPath.compile().
+
+    The plan is an immutable tuple of (key, index, expression) steps: 'index' is the precomputed integer
+    value of a plain key (or None) and 'expression' the parsed wild key (or None for plain keys). The
+    evaluators walk the steps by index with an explicit stack, so no sub-paths are created and the
+    depth of the path does not add to the recursion depth.
+    """
+
+    __slots__ = ("path", "steps", "depth")
+
+    def __init__(self, path, expressions):
+        self.path = path
+        self.steps = tuple((key, _as_index(key) if expr is None else None, expr)
+                           for key, expr in zip(path, expressions))
+        self.depth = len([expr for expr in expressions if expr is not None]) - 1
+
+    def __repr__(self):
+        return "%s(%r)" % (self.__class__.__name__, self.path)
+
+    def __reduce__(self):
+        return _compile, (self.path.__class__, tuple(self.path))
+
+    def get_in(self, obj, default=_marker, flat=False, flat_iter=False, workers=None):
+        if workers is not None:
+            result = self._get_in_parallel(obj, default, workers)
+            if flat or flat_iter:
+                result = _flat_values(result, self.depth)
+                return iter(result) if flat_iter else list(result)
+            return result
+        if flat_iter:
+            return self.iter_flat_in(obj, default)
+        if flat:
+            return list(self.iter_flat_in(obj, default))
+        return self._get_in(obj, default)
+
+    def _get_in_parallel(self, obj, default, workers):
+        """ get_in, with the items selected by the first wild key evaluated in chunks by a pool of workers """
+        steps, path = self.steps, self.path
+        wild = [i for i, (_, _, expr) in enumerate(steps) if expr is not None]
+        if not wild or wild[0] == len(steps) - 1:  # nothing to evaluate per selected item
+            return self._get_in(obj, default)
+        i = wild[0]
+        try:
+            obj = path[:i].compile()._get_in(obj)
+        except (KeyError, IndexError, AttributeError):
+            if default is _marker:
+                raise
+            return default
+        result, slots, children = _select_children(steps[i][2], obj)
+        values = map_chunks(_get_chunk, children, workers, path[i + 1:].compile(), default is not _marker, default)
+        for slot, value in zip(slots, values):
+            result[slot] = value
+        return result
+
+    def iter_many(self, records, default=_marker, flat=False, column=False):
+        """ returns an iterator over get_in(record, default, flat) for all records, or with 'column' over the
+            flat values of all records """
+        get_in, depth = self._get_in, self.depth
+        if column:
+            return chain.from_iterable(_flat_values(get_in(record, default), depth) for record in records)
+        if flat:
+            return (list(_flat_values(get_in(record, default), depth)) for record in records)
+        return (get_in(record, default) for record in records)
+
+    def set_in(self, obj, value):
+        self._set_in(obj, value)
+
+    def del_in(self, obj):
+        self._del_in(obj)
+
+    def pop_in(self, obj):
+        result = self._get_in(obj)
+        self._del_in(obj)
+        return result
+
+    def has_in(self, obj):
+        """checks presence of all item(s) at the path in 'obj'"""
+        try:
+            self._get_in(obj)
+        except (KeyError, IndexError, AttributeError):
+            return False
+        return True
+
+    def iter_in(self, obj):
+        """
+        Yields (keys, value) for all items at the path in 'obj', in the same order as in the result of get_in;
+        'keys' is the tuple of concrete keys (indices as str). Items that are not present are skipped. Only an
+        iterator per wild step is kept, so the memory use does not depend on the number of items.
+        """
+        for keys, value, _ in self._iter_in(obj, _skip):
+            yield keys, value
+
+    def iter_flat_in(self, obj, default=_marker):
+        """ yields the values of get_in(obj, default, flat=True), without building the (nested) result first """
+        for _, value, depth in self._iter_in(obj, default):
+            if depth < 0:
+                yield value
+            else:  # a default in place of a part of the result that would be flattened
+                for sub_value in iter_flatten(value, depth):
+                    yield sub_value
+
+    def _iter_in(self, obj, default, node_kinds=node_kinds, get_attributes=_Attributes,
+                 select_indices=_select_indices):
+        """ yields (keys, value, depth), with 'depth' the levels of 'value' flattened by get_in(obj, flat=True) """
+        steps = self.steps
+        last = len(steps)
+        depths = [len([s for s in steps[i:] if s[2] is not None]) - 1 for i in range(last + 1)]
+        stack = [iter([((), obj, 0)])]
+        while stack:
+            for keys, obj, i in stack[-1]:
+                break
+            else:
+                stack.pop()
+                continue
+            try:
+                while i < last:
+                    key, index, expr = steps[i]
+                    if expr is not None:
+                        break
+                    read = node_kinds[type(obj)].read
+                    if read == MAPPING:
+                        obj = obj[key]
+                    elif read == SEQUENCE and index is not None:
+                        obj = obj[index]
+                    else:
+                        obj = getattr(obj, key)
+                    keys += (key,)
+                    i += 1
+            except (KeyError, IndexError, AttributeError):
+                if default is _marker:
+                    raise
+                if default is not _skip:
+                    yield keys, default, depths[i]
+                continue
+            if i == last:
+                yield keys, obj, -1
+                continue
+            kind = node_kinds[type(obj)]
+            if kind.select == MAPPING:
+                selected = expr.keys_in(obj)
+                stack.append(_iter_children(keys, obj, selected, selected, i + 1))
+            else:
+                indices = select_indices(expr, obj, kind)
+                if indices is None:
+                    attributes = get_attributes(obj)
+                    selected = expr.keys_in(attributes)
+                    stack.append(_iter_children(keys, attributes, selected, selected, i + 1))
+                else:
+                    stack.append(_iter_children(keys, obj, indices, map(str, indices), i + 1))
+
+    def _get_in(self, obj, default=_marker, node_kinds=node_kinds, get_attributes=_Attributes,
+                select_indices=_select_indices):
+        """returns item(s) at the path from the 'obj'"""
+        steps = self.steps
+        last = len(steps)
+        root = [None]
+        stack = [(root, 0, obj, 0)]
+        push, pop = stack.append, stack.pop
+        while stack:
+            parent, slot, obj, i = pop()
+            while i < last:  # plain keys are followed in place
+                key, index, expr = steps[i]
+                if expr is not None:
+                    break
+                try:
+                    read = node_kinds[type(obj)].read
+                    if read == MAPPING:
+                        obj = obj[key]
+                    elif read == SEQUENCE and index is not None:
+                        obj = obj[index]
+                    else:
+                        obj = getattr(obj, key)
+                except (KeyError, IndexError, AttributeError):
+                    if default is _marker:
+                        raise
+                    obj, i = default, last
+                    break
+                i += 1
+            if i == last:
+                parent[slot] = obj
+                continue
+            kind = node_kinds[type(obj)]
+            if kind.select == MAPPING:
+                keys = expr.keys_in(obj)
+                result = dict.fromkeys(keys)  # fixes the order of the keys
+                children = [(k, obj[k]) for k in keys]
+            else:
+                indices = select_indices(expr, obj, kind)
+                if indices is None:
+                    attributes = get_attributes(obj)
+                    keys = expr.keys_in(attributes)
+                    result = dict.fromkeys(keys)
+                    children = [(k, attributes[k]) for k in keys]
+                else:
+                    result = [None] * len(indices)
+                    children = [(j, obj[index]) for j, index in enumerate(indices)]
+            parent[slot] = result
+            if i + 1 == last:
+                for k, child in children:
+                    result[k] = child
+            else:
+                for k, child in reversed(children):
+                    push((result, k, child, i + 1))
+        return root[0]
+
+    def _set_in(self, obj, value, node_kinds=node_kinds, get_attributes=_Attributes, wild_indices=_wild_indices,
+                get_with_key=_get_with_key, get_with_index=_get_with_index):
+        """sets item(s) at the path of 'obj' to 'value'"""
+        steps = self.steps
+        last = len(steps) - 1
+        stack = [(obj, value, 0)]
+        push, pop = stack.append, stack.pop
+        while stack:
+            obj, value, i = pop()
+            key, index, expr = steps[i]
+            write = node_kinds[type(obj)].write
+            if expr is None:
+                if write == MAPPING:
+                    if i == last:
+                        obj[key] = value
+                    else:
+                        push((obj[key], get_with_key(value, key), i + 1))
+                elif write == SEQUENCE and index is not None:
+                    if i == last:
+                        obj[index] = value
+                    else:
+                        push((obj[index], get_with_index(value, index), i + 1))
+                elif i == last:
+                    setattr(obj, key, value)
+                else:
+                    push((getattr(obj, key), get_with_key(value, key), i + 1))
+                continue
+            if write == MAPPING:
+                if i == last:
+                    for k in expr.keys_in(obj):
+                        obj[k] = get_with_key(value, k)
+                else:
+                    for k in reversed(expr.keys_in(obj)):
+                        push((obj[k], get_with_key(value, k), i + 1))
+                continue
+            indices = wild_indices(expr, obj) if write == SEQUENCE else None
+            if indices is None:
+                if i == last:
+                    for k in expr.keys_in(get_attributes(obj)):
+                        setattr(obj, k, get_with_key(value, k))
+                else:
+                    attributes = get_attributes(obj)
+                    for k in reversed(expr.keys_in(attributes)):
+                        push((attributes[k], get_with_key(value, k), i + 1))
+            else:
+                if i == last:
+                    for j, index in enumerate(indices):
+                        obj[index] = get_with_index(value, j)
+                else:
+                    for j in reversed(range(len(indices))):
+                        push((obj[indices[j]], get_with_index(value, j), i + 1))
+
+    def _del_in(self, obj, node_kinds=node_kinds, get_attributes=_Attributes, wild_indices=_wild_indices):
+        """deletes item(s) at the path from the 'obj'"""
+        steps = self.steps
+        last = len(steps) - 1
+        stack = [(obj, 0)]
+        push, pop = stack.append, stack.pop
+        while stack:
+            obj, i = pop()
+            key, index, expr = steps[i]
+            write = node_kinds[type(obj)].write
+            if expr is None:
+                if write == MAPPING:
+                    if i == last:
+                        del obj[key]
+                    else:
+                        push((obj[key], i + 1))
+                elif write == SEQUENCE and index is not None:
+                    if i == last:
+                        del obj[index]
+                    else:
+                        push((obj[index], i + 1))
+                elif i == last:
+                    delattr(obj, key)
+                else:
+                    push((getattr(obj, key), i + 1))
+                continue
+            if write == MAPPING:
+                if i == last:
+                    for k in expr.keys_in(obj):
+                        del obj[k]
+                else:
+                    for k in reversed(expr.keys_in(obj)):
+                        push((obj[k], i + 1))
+                continue
+            indices = wild_indices(expr, obj) if write == SEQUENCE else None
+            if indices is None:
+                if i == last:
+                    for k in expr.keys_in(get_attributes(obj)):
+                        delattr(obj, k)
+                else:
+                    attributes = get_attributes(obj)
+                    for k in reversed(expr.keys_in(attributes)):
+                        push((attributes[k], i + 1))
+            else:
+                if i == last:
+                    if isinstance(indices, range) and abs(indices.step) == 1:
+                        if len(indices):
+                            del obj[min(indices):max(indices) + 1]
+                    else:
+                        deleted = indices if isinstance(indices, range) else set(indices)
+                        obj[:] = [v for j, v in enumerate(obj) if j not in deleted]
+                else:
+                    for index in reversed(indices):
+                        push((obj[index], i + 1))
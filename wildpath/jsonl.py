@@ -0,0 +1,101 @@
+import os
+
+from itertools import islice
+
+from wildpath.parallel import imap_tasks
+from wildpath.pathset import PathSet
+from wildpath.tools import _marker
+
+__author__ = "Lars van Gemerden"
+
+RANGE_SIZE = 1 << 24  # bytes of the file evaluated at a time by a worker
+
+BATCH_SIZE = 4096  # lines evaluated at a time by a worker in iter_jsonl
+
+
+def _map_file(filename):
+    from mmap import mmap, ACCESS_READ  # imported when used, so 'import wildpath' stays fast
+    with open(filename, "rb") as fp:
+        return mmap(fp.fileno(), 0, access=ACCESS_READ)
+
+
+def line_ranges(filename, range_size=RANGE_SIZE):
+    """ returns (start, end) byte ranges of about 'range_size' that cover the file, ending after a newline """
+    size = os.path.getsize(filename)
+    if not size:  # an empty file cannot be memory-mapped
+        return []
+    ranges, start = [], 0
+    data = _map_file(filename)
+    try:
+        while start < size:
+            end = data.find(b"\n", start + range_size - 1) + 1 or size
+            ranges.append((start, end))
+            start = end
+    finally:
+        data.close()
+    return ranges
+
+
+def _iter_range_lines(data, start, end):
+    find = data.find
+    while start < end:
+        line_end = find(b"\n", start, end)
+        if line_end < 0:
+            line_end = end
+        yield data[start:line_end]
+        start = line_end + 1
+
+
+def scan_lines(lines, patterns, has_default=True, default=None, flat=False):
+    """ returns PathSet(patterns).get_in(obj, flat) for the JSON in each (non-empty) line of 'lines' """
+    from json import JSONDecoder
+    get_in = PathSet(patterns, default if has_default else _marker).get_in  # _marker does not survive pickling
+    decode = JSONDecoder().decode  # json.loads would detect the encoding of every line
+    return [get_in(decode(line if isinstance(line, str) else line.decode("utf-8")), flat)
+            for line in lines if line and not line.isspace()]
+
+
+def scan_range(filename, start, end, patterns, has_default=True, default=None, flat=False):
+    """ returns scan_lines() for the lines in byte range 'start' to 'end' of the file """
+    data = _map_file(filename)
+    try:
+        return scan_lines(_iter_range_lines(data, start, end), patterns, has_default, default, flat)
+    finally:
+        data.close()
+
+
+def scan_jsonl(filename, patterns, workers=None, ordered=True, default=_marker, flat=False, range_size=RANGE_SIZE):
+    """
+    Yields the results of PathSet(patterns, default).get_in(obj, flat) ({path: value}) for each line of the
+    JSON Lines file 'filename'. The file is memory-mapped and split into byte ranges on line boundaries; with
+    'workers' (a number or a concurrent.futures.Executor) each range is parsed and evaluated by a worker
+    process (threads on free-threaded python), which maps the file itself, so the file is not copied between
+    processes. With 'ordered' the results are produced in the order of the lines; otherwise in the order the
+    ranges are finished. Empty lines are skipped.
+    """
+    args = (patterns, default is not _marker, default, flat)
+    tasks = ((filename, start, end) + args for start, end in line_ranges(filename, range_size))
+    if workers is None:
+        for task in tasks:
+            for result in scan_range(*task):
+                yield result
+    else:
+        for result in imap_tasks(scan_range, tasks, workers, ordered):
+            yield result
+
+
+def iter_jsonl(lines, patterns, workers=None, ordered=True, default=_marker, flat=False, batch_size=BATCH_SIZE):
+    """
+    Like scan_jsonl, for an iterable of lines (str or bytes) instead of a file name, e.g. sys.stdin; with
+    'workers' batches of lines are sent to the workers.
+    """
+    args = (patterns, default is not _marker, default, flat)
+    lines = iter(lines)
+    batches = iter(lambda: list(islice(lines, batch_size)), [])
+    if workers is None:
+        for batch in batches:
+            for result in scan_lines(batch, *args):
+                yield result
+    else:
+        for result in imap_tasks(scan_lines, ((batch,) + args for batch in batches), workers, ordered):
+            yield result
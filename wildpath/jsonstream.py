@@ -0,0 +1,335 @@
+import re
+
+from codecs import getincrementaldecoder
+from sys import maxsize
+
+from wildpath.compiled import CompiledWildPath, _as_index, _skip
+from wildpath.keyparser import WildSymbol, LIST_NOT, LIST_OR
+from wildpath.tools import iter_flatten, _marker
+
+__author__ = "Lars van Gemerden"
+
+CHUNK_SIZE = 1 << 16
+
+_whitespace = re.compile(r"[ \t\n\r]*")
+#  skips to the next bracket, over strings (which can contain brackets); stops at a string that is not complete
+_to_bracket = re.compile(r'[^"\[\]{}]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^"\[\]{}]*)*')
+_string_part = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*')  # stops at the closing quote or a backslash at the end
+_scalar = re.compile(r'[^ \t\n\r,\]}]*')
+
+
+def _always(key):
+    return True
+
+
+def _never(key):
+    return False
+
+
+def key_matcher(expr):
+    """ returns a function str -> bool that tells whether a key of a JSON object is selected by 'expr' """
+    if isinstance(expr, WildSymbol):
+        if expr.obj is WildSymbol.ALL:
+            return _always
+        if expr.match is None:
+            raise TypeError("%r cannot select str keys" % (expr.obj,))
+        return expr.match
+    matchers = [key_matcher(arg) for arg in expr.args]
+    if isinstance(expr, LIST_NOT):
+        return lambda key: not matchers[0](key)
+    if isinstance(expr, LIST_OR):
+        return lambda key: any(match(key) for match in matchers)
+    return lambda key: all(match(key) for match in matchers)  # LIST_AND
+
+
+def index_matcher(expr):
+    """
+    returns a function int -> bool that tells whether an index of a JSON array is selected by 'expr', or None
+    if that depends on the length of the array (e.g. negative indices), which is not known while reading it;
+    raises ValueError if 'expr' contains keys that are not indices (like WildSymbol.indices)
+    """
+    if isinstance(expr, WildSymbol):
+        wild_key = expr.obj
+        if wild_key is WildSymbol.ALL:
+            return _always
+        if isinstance(wild_key, slice):
+            start, stop, step = wild_key.start or 0, wild_key.stop, wild_key.step or 1
+            if start < 0 or step < 0 or (stop is not None and stop < 0):
+                return None
+            return range(start, maxsize if stop is None else stop, step).__contains__
+        index = int(wild_key)
+        return None if index < 0 else index.__eq__
+    matchers = [index_matcher(arg) for arg in expr.args]
+    if None in matchers:
+        return None
+    if isinstance(expr, LIST_NOT):
+        return lambda index: not matchers[0](index)
+    if isinstance(expr, LIST_OR):
+        return lambda index: any(match(index) for match in matchers)
+    return lambda index: all(match(index) for match in matchers)  # LIST_AND
+
+
+class JSONReader(object):
+    """
+    Incremental reader of a JSON document from a file(-like) object in text or binary (utf-8) mode. Values can
+    be parsed (with the json module) or skipped; skipping only scans for the characters that delimit strings and
+    containers. Only the part of the document that is being parsed is kept in memory.
+    """
+
+    def __init__(self, fp, chunk_size=CHUNK_SIZE):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self._decode = None
+        from json import JSONDecoder  # imported when used, so 'import wildpath' stays fast
+        self._raw_decode = JSONDecoder().raw_decode
+
+    def _fill(self, size=None):
+        """ drops the consumed part of the buffer and reads more; returns False at the end of the file """
+        if self.eof:
+            return False
+        chunk = self.fp.read(size or self.chunk_size)
+        self.eof = not chunk
+        if isinstance(chunk, bytes):  # a chunk can end inside a character: the decoder keeps the start of it
+            if self._decode is None:
+                self._decode = getincrementaldecoder("utf-8")().decode
+            chunk = self._decode(chunk, self.eof)
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def _error(self, message):
+        return ValueError("%s in JSON (near %r)" % (message, self.buffer[self.pos:self.pos + 20]))
+
+    def next_char(self):
+        """ skips whitespace and returns the next character without consuming it ("" at the end of the file) """
+        buffer, pos = self.buffer, self.pos
+        if pos < len(buffer) and buffer[pos] not in " \t\n\r":
+            return buffer[pos]
+        while True:
+            self.pos = _whitespace.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, chars):
+        """ consumes and returns the next character, which must be one of 'chars' """
+        char = self.next_char()
+        if not char or char not in chars:
+            raise self._error("expected one of %r" % chars if char else "unexpected end")
+        self.pos += 1
+        return char
+
+    def parse_value(self):
+        """ parses and returns the next value """
+        if self.next_char() not in '"[{':  # a number or literal: read on to the character after it
+            while _scalar.match(self.buffer, self.pos).end() == len(self.buffer) and self._fill():
+                pass
+        while True:
+            try:
+                value, self.pos = self._raw_decode(self.buffer, self.pos)
+                return value
+            except ValueError:
+                #  the value continues after the buffer: read at least as much as is already buffered, so a
+                #  large value is not decoded from the start for every chunk
+                if self.eof or not self._fill(max(self.chunk_size, len(self.buffer))):
+                    raise
+
+    def skip_value(self):
+        """ skips the next value, without decoding it """
+        char = self.next_char()
+        if char == '"':
+            self.pos += 1
+            self._skip_string()
+        elif char in ("[", "{"):
+            self._skip_container()
+        elif char:
+            self._skip_scalar()
+        else:
+            raise self._error("unexpected end")
+
+    def _skip_string(self):
+        """ skips the rest of a string, after the opening quote """
+        while True:
+            self.pos = _string_part.match(self.buffer, self.pos).end()
+            if self.buffer.startswith('"', self.pos):
+                self.pos += 1
+                return
+            if not self._fill():  # at the end of the buffer or a backslash escaping a character in the next chunk
+                raise self._error("unterminated string")
+
+    def _skip_container(self):
+        depth = 0
+        while True:
+            self.pos = _to_bracket.match(self.buffer, self.pos).end()
+            char = self.buffer[self.pos:self.pos + 1]
+            self.pos += 1
+            if char == '"':  # a string that continues after the buffer
+                self._skip_string()
+            elif char in ("[", "{"):
+                depth += 1
+            elif char:
+                depth -= 1
+                if not depth:
+                    return
+            else:
+                self.pos -= 1
+                if not self._fill():
+                    raise self._error("unexpected end")
+
+    def _skip_scalar(self):
+        while True:
+            self.pos = _scalar.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer) or not self._fill():
+                return
+
+    def iter_object_keys(self):
+        """ consumes an object and yields its keys; after each key the value must be parsed or skipped """
+        self.expect("{")
+        if self.next_char() == "}":
+            self.pos += 1
+            return
+        while True:
+            if self.next_char() != '"':
+                raise self._error("expected a key")
+            key = self.parse_value()
+            self.expect(":")
+            yield key
+            if self.expect(",}") == "}":
+                return
+
+    def iter_array_indices(self):
+        """ consumes an array and yields its indices; after each index the value must be parsed or skipped """
+        self.expect("[")
+        if self.next_char() == "]":
+            self.pos += 1
+            return
+        index = 0
+        while True:
+            yield index
+            if self.expect(",]") == "]":
+                return
+            index += 1
+
+
+def iter_json(fp, path, chunk_size=CHUNK_SIZE):
+    """
+    Yields (keys, value) for the items at 'path' (a Path or WildPath) in the JSON document in file 'fp', in the
+    order of the document, with 'keys' a tuple of str. Only the values at the path are decoded. Arrays that are
+    selected with negative indices are decoded as a whole, since the selection depends on their length. Items
+    that are not present are skipped, as in iter_in.
+    """
+    for keys, value, _ in _iter_json(fp, path, chunk_size, _skip):
+        yield keys, value
+
+
+def iter_flat_json(fp, path, default=_marker, chunk_size=CHUNK_SIZE):
+    """
+    Yields the values of path.get_in(obj, default, flat=True) for the JSON document 'obj' in file 'fp' (a
+    WildPath), reading it like iter_json, in the order of the document (see in_document_order). Without
+    'default', an item that is not present raises KeyError, IndexError or AttributeError, as in get_in.
+    """
+    for _, value, depth in _iter_json(fp, path, chunk_size, default):
+        if depth < 0:
+            yield value
+        else:  # a default in place of a part of the result that would be flattened
+            for sub_value in iter_flatten(value, depth):
+                yield sub_value
+
+
+def in_document_order(path):
+    """
+    returns whether iter_json produces the items at 'path' in the order of get_in; not if a wild key contains
+    '|', since its keys are ordered by the alternatives (e.g. "b|a")
+    """
+    compiled = path.compile()
+    return not isinstance(compiled, CompiledWildPath) or not any(_has_or(expr) for _, _, expr in compiled.steps)
+
+
+def _has_or(expr):
+    return expr is not None and (isinstance(expr, LIST_OR) or any(_has_or(arg) for arg in expr.args))
+
+
+def _iter_json(fp, path, chunk_size, default):
+    """ yields (keys, value, depth) like CompiledWildPath._iter_in, for missing items according to 'default' """
+    compiled = path.compile()
+    if isinstance(compiled, CompiledWildPath):
+        steps = compiled.steps
+    else:
+        steps = [(key, _as_index(key), None) for key in path]
+    depths = [len([s for s in steps[i:] if s[2] is not None]) - 1 for i in range(len(steps) + 1)]
+    reader = JSONReader(fp, chunk_size)
+    return _iter_items(reader, path, steps, 0, (), default, depths)
+
+
+def _iter_items(reader, path, steps, i, keys, default, depths):
+    if i == len(steps):
+        yield keys, reader.parse_value(), -1
+        return
+    key, index, expr = steps[i]
+    char = reader.next_char()
+    if char == "{":
+        match, found = None, False
+        for name in reader.iter_object_keys():
+            if match is None:  # (like keys_in) a slice only raises TypeError for an object with keys
+                match = key.__eq__ if expr is None else key_matcher(expr)
+            if match(name):
+                found = True
+                for item in _iter_items(reader, path, steps, i + 1, keys + (name,), default, depths):
+                    yield item
+            else:
+                reader.skip_value()
+        if expr is None and not found:
+            if default is _marker:
+                raise KeyError(key)
+            if default is not _skip:
+                yield keys, default, depths[i]
+        return
+    if char == "[":
+        if expr is None:  # a key that is not an index looks up an attribute of the list, as in get_in
+            match = None if index is None or index < 0 else index.__eq__
+        else:
+            try:
+                match = index_matcher(expr)
+            except ValueError:  # e.g. "a*", which does not select indices
+                match = _never
+        if match is not None:
+            found = False
+            for j in reader.iter_array_indices():
+                if match(j):
+                    found = True
+                    for item in _iter_items(reader, path, steps, i + 1, keys + (str(j),), default, depths):
+                        yield item
+                else:
+                    reader.skip_value()
+            if expr is None and not found:
+                if default is _marker:
+                    raise IndexError("list index out of range")
+                if default is not _skip:
+                    yield keys, default, depths[i]
+            return
+    #  a string or number (wild keys can select their characters or attributes) or an array of which the selection
+    #  depends on its length: decoded, with the rest of the path evaluated on it as in get_in
+    for sub_keys, value, depth in _iter_sub_path(path[i:], reader.parse_value(), default):
+        yield keys + sub_keys, value, depth
+
+
+def _iter_sub_path(path, value, default):
+    """ yields (keys, value, depth) for the items at 'path' in a decoded value """
+    compiled = path.compile()
+    if isinstance(compiled, CompiledWildPath):
+        for item in compiled._iter_in(value, default):
+            yield item
+        return
+    try:
+        value = path.get_in(value)
+    except (KeyError, IndexError, AttributeError):
+        if default is _marker:
+            raise
+        if default is not _skip:
+            yield (), default, -1
+    else:
+        yield tuple(path), value, -1
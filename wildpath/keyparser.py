@@ -1,12 +1,48 @@
-from fnmatch import fnmatchcase
+import re
+
+from fnmatch import translate
+from functools import partial
+from itertools import chain
+from operator import eq, methodcaller
 
-import sys
 from boolean import BooleanAlgebra, AND, OR, NOT, Symbol
 from boolean import ParseError, TOKEN_SYMBOL, TOKEN_NOT, TOKEN_AND, TOKEN_OR, TOKEN_LPAR, TOKEN_RPAR
 from boolean.boolean import PARSE_UNKNOWN_TOKEN
 
 from wildpath.tools import dedoubled
 
+GLOB_CHARACTERS = "*?["
+
+
+def _is_literal(glob):
+    return not any(c in glob for c in GLOB_CHARACTERS)
+
+
+def _has_str_keys(mapping):
+    """ keys are either all str or all int (see WildSymbol.select), so checking one key is enough """
+    for key in mapping:
+        return isinstance(key, str)
+    return True
+
+
+def compile_glob(glob):
+    """ returns the cheapest function key -> bool that gives the same result as fnmatchcase(key, glob) """
+    if _is_literal(glob):
+        return partial(eq, glob)
+    if len(glob) > 1:
+        if glob[-1] == "*" and _is_literal(glob[:-1]):
+            return methodcaller("startswith", glob[:-1])
+        if glob[0] == "*" and _is_literal(glob[1:]):
+            return methodcaller("endswith", glob[1:])
+        if len(glob) > 2 and glob[0] == glob[-1] == "*" and _is_literal(glob[1:-1]):
+            return methodcaller("__contains__", glob[1:-1])
+    return re.compile(translate(glob)).match
+
+
+def compile_globs(globs):
+    """ returns a function key -> bool that matches any of the globs, with a single regular expression """
+    return re.compile("|".join("(?:%s)" % translate(glob) for glob in globs)).match
+
 
 class WildSymbol(Symbol):
 
@@ -19,13 +55,39 @@ class WildSymbol(Symbol):
             super(WildSymbol, self).__init__(slice(*map(parse_slice_item, wild_key.split(':'))))
         else:
             super(WildSymbol, self).__init__(wild_key)
+        if isinstance(self.obj, str):
+            self.match = compile_glob(self.obj)
+            #  a symbol without glob characters matches only a key equal to itself: it can be looked up directly
+            self.literal_key = self.obj if _is_literal(self.obj) else None
+        else:
+            self.match = None
+            self.literal_key = None
 
     def __call__(self, *keys):
+        return self.select(keys)
+
+    def indices(self, length):
+        """ returns the indices selected by this symbol in a sequence of 'length'; the same as
+            self.select(range(length)), but as a range or a short list and without creating all indices """
+        wild_key = self.obj
+        if not length or wild_key is self.ALL:
+            return range(length)
+        if isinstance(wild_key, slice):
+            return range(*wild_key.indices(length))
+        index = int(wild_key)  # ValueError for wild keys that do not select indices, e.g. "a*"
+        if index < 0:
+            index %= length  # same as adding 'length' until the index is positive
+        return [index] if index < length else []
+
+    def select(self, keys):
+        """ returns the keys in the sequence 'keys' selected by this symbol, in the same order """
         wild_key = self.obj
         if not len(keys) or wild_key is self.ALL:
             return list(keys)
         if isinstance(keys[0], str):  # all keys are str or all keys are int
-            return [k for k in keys if fnmatchcase(k, wild_key)]
+            if self.match is None:
+                raise TypeError("%r cannot select str keys" % (self.obj,))
+            return list(filter(self.match, keys))
         try:
             index = int(wild_key)
         except TypeError:
@@ -35,6 +97,21 @@ class WildSymbol(Symbol):
                 index += len(keys)
             return [index] if index in keys else []
 
+    def keys_in(self, mapping):
+        """ returns the keys in 'mapping' selected by this symbol; the same as self.select(list(mapping)) """
+        if self.match is not None and _has_str_keys(mapping):
+            if self.literal_key is not None:
+                return [self.literal_key] if self.literal_key in mapping else []
+            return list(filter(self.match, mapping))
+        return self.select(list(mapping))
+
+    def __hash__(self):
+        """ slices are not hashable (before python 3.12), but simplify() puts symbols in sets """
+        wild_key = self.obj
+        if isinstance(wild_key, slice):
+            return hash((slice, wild_key.start, wild_key.stop, wild_key.step))
+        return hash(wild_key)
+
     def __lt__(self, other):
         """ due to small bug in boolean.py """
         return NotImplemented
@@ -44,21 +121,106 @@ class WildSymbol(Symbol):
 class LIST_NOT(NOT):
 
     def __call__(self, *keys):
-        not_keys = self.args[0](*keys)
+        return self.select(keys)
+
+    def select(self, keys):
+        not_keys = set(self.args[0].select(keys))
         return [k for k in keys if k not in not_keys]
 
+    def indices(self, length):
+        not_indices = self.args[0].indices(length)
+        if isinstance(not_indices, range) and abs(not_indices.step) == 1 and len(not_indices):
+            start, stop = min(not_indices), max(not_indices) + 1
+            return list(range(start)) + list(range(stop, length))
+        if not isinstance(not_indices, range):
+            not_indices = set(not_indices)
+        return [i for i in range(length) if i not in not_indices]
+
+    def keys_in(self, mapping):
+        not_keys = set(self.args[0].keys_in(mapping))
+        return [k for k in mapping if k not in not_keys]
+
 
 class LIST_OR(OR):
 
+    def __init__(self, arg1, arg2, *args):
+        super(LIST_OR, self).__init__(arg1, arg2, *args)
+        #  only symbols are combined; other arguments (e.g. the nested OR in "(a*|b*)|c") use the generic selection
+        symbols = all(isinstance(a, WildSymbol) for a in self.args)
+        literal_keys = [a.literal_key if symbols else None for a in self.args]
+        matches = [a.match if symbols else None for a in self.args]
+        self.literal_keys = self.matches = self.match = None
+        if None not in literal_keys:
+            #  an OR of literals (e.g. "id|name|email") selects the literals that are present in a mapping
+            self.literal_keys = dedoubled(literal_keys)
+        elif None not in matches:
+            #  an OR of globs (e.g. "*_location|*_time") is matched with one regular expression
+            self.matches = matches
+            self.match = compile_globs([a.obj for a in self.args])
+
     def __call__(self, *keys):
-        return dedoubled(sum((a(*keys) for a in self.args), []))
+        return self.select(keys)
+
+    def select(self, keys):
+        return dedoubled(chain.from_iterable(a.select(keys) for a in self.args))
+
+    def indices(self, length):
+        return dedoubled(chain.from_iterable(a.indices(length) for a in self.args))
+
+    def keys_in(self, mapping):
+        if self.match is not None or self.literal_keys is not None:
+            if _has_str_keys(mapping):
+                if self.literal_keys is not None:
+                    return [k for k in self.literal_keys if k in mapping]
+                return self._select_matches(mapping)
+        return dedoubled(chain.from_iterable(a.keys_in(mapping) for a in self.args))
+
+    def _select_matches(self, keys):
+        """ selects the (unique) keys matching any glob in one pass, then orders them by the first glob they match """
+        selected = list(filter(self.match, keys))
+        if not selected:
+            return selected
+        groups = [[] for _ in self.matches]
+        for key in selected:
+            for group, match in zip(groups, self.matches):
+                if match(key):
+                    group.append(key)
+                    break
+        return list(chain.from_iterable(groups))
 
 
 class LIST_AND(AND):
 
     def __call__(self, *keys):
-        key_lists = [a(*keys) for a in self.args]
-        return [k for k in key_lists[0] if all(k in kl for kl in key_lists)]
+        return self.select(keys)
+
+    def select(self, keys):
+        #  the result keeps the order of the keys selected by the first argument
+        key_sets = [set(a.select(keys)) for a in self.args[1:]]
+        return [k for k in self.args[0].select(keys) if all(k in ks for ks in key_sets)]
+
+    def indices(self, length):
+        #  ranges are kept as they are ('in' is fast), so the cost depends on the shortest selection, not on 'length'
+        index_lists = [a.indices(length) for a in self.args]
+        first = index_lists[0]
+        shortest = min(index_lists, key=len)
+        index_sets = [il if isinstance(il, range) else set(il) for il in index_lists]
+        selected = [i for i in shortest if all(i in s for s in index_sets)]
+        if shortest is first or len(selected) < 2:
+            return selected
+        if isinstance(first, range):  # sorted, in the order of the first argument
+            return sorted(selected, reverse=first.step < 0)
+        selected = set(selected)
+        return [i for i in first if i in selected]
+
+    def keys_in(self, mapping):
+        if not _has_str_keys(mapping):
+            return self.select(list(mapping))
+        #  with str keys, every key is selected or not on its own, so the other arguments only need to be
+        #  applied to the keys selected by the first (e.g. in "name&!_*" only 'name' is tested against "_*")
+        candidates = self.args[0].keys_in(mapping)
+        key_sets = [set(a.select(candidates)) for a in self.args[1:]]
+        return [k for k in candidates if all(k in ks for ks in key_sets)]
 
 
 class KeyParser(BooleanAlgebra):
@@ -0,0 +1,213 @@
+from typing import Mapping, Sequence, MutableMapping, MutableSequence
+from weakref import WeakKeyDictionary
+
+__author__ = "Lars van Gemerden"
+
+value_sequence_types = (str, bytearray, bytes)
+
+#  the ways in which items of an object can be read, written or iterated over
+LEAF, OBJECT, MAPPING, SEQUENCE = "leaf", "object", "mapping", "sequence"
+
+#  the kinds of class attributes, see ObjectSchema
+METHOD, DESCRIPTOR, CLASS_DATA = "method", "descriptor", "class data"
+
+
+class NodeKind(object):
+    """
+    Describes how the paths handle objects of a type:
+
+     - 'read': MAPPING, SEQUENCE or OBJECT; how items are looked up (key, index or attribute),
+     - 'write': MAPPING, SEQUENCE or OBJECT; how items are set and deleted,
+     - 'walk': MAPPING, SEQUENCE, OBJECT or LEAF; how the iterators (Path.items, ...) and flatten treat the object,
+     - 'select': MAPPING, SEQUENCE or OBJECT; how wild keys select items (by default the same as 'read').
+    """
+
+    __slots__ = ("read", "write", "walk", "select")
+
+    def __init__(self, read, write, walk, select=None):
+        self.read = read
+        self.write = write
+        self.walk = walk
+        self.select = read if select is None else select
+
+    def __repr__(self):
+        return "%s(%r, %r, %r, %r)" % (self.__class__.__name__, self.read, self.write, self.walk, self.select)
+
+
+MUTABLE_MAPPING_KIND = NodeKind(MAPPING, MAPPING, MAPPING)
+MAPPING_KIND = NodeKind(MAPPING, OBJECT, MAPPING)
+MUTABLE_SEQUENCE_KIND = NodeKind(SEQUENCE, SEQUENCE, SEQUENCE)
+SEQUENCE_KIND = NodeKind(SEQUENCE, OBJECT, SEQUENCE)
+MUTABLE_VALUE_SEQUENCE_KIND = NodeKind(SEQUENCE, SEQUENCE, LEAF)
+VALUE_SEQUENCE_KIND = NodeKind(SEQUENCE, OBJECT, LEAF)
+OBJECT_KIND = NodeKind(OBJECT, OBJECT, OBJECT)
+VALUE_KIND = NodeKind(OBJECT, OBJECT, LEAF)
+NAMED_TUPLE_KIND = NodeKind(SEQUENCE, OBJECT, OBJECT, OBJECT)  # items can be read by index, but are fields
+
+
+def is_named_tuple(cls):
+    return issubclass(cls, tuple) and isinstance(getattr(cls, "_fields", None), tuple)
+
+
+def slot_names(cls):
+    """ returns the names of the slots of 'cls' and its base classes, base classes first """
+    names = []
+    for base in reversed(cls.__mro__):
+        slots = base.__dict__.get("__slots__", ())
+        for name in ((slots,) if isinstance(slots, str) else slots):
+            if name.startswith("__") and not name.endswith("__"):  # name mangling
+                name = "_%s%s" % (base.__name__.lstrip("_"), name)
+            if name not in names and name not in ("__dict__", "__weakref__"):
+                names.append(name)
+    return names
+
+
+def is_record_class(cls):
+    """
+    returns whether instances are walked as records without having a __dict__: (slotted) dataclasses. Other classes
+    with __slots__ (e.g. uuid.UUID or fractions.Fraction) are values, unless registered, e.g. with
+    register(MyRecord, OBJECT_KIND)
+    """
+    return hasattr(cls, "__dataclass_fields__")  # as dataclasses.is_dataclass, without importing dataclasses
+
+
+def record_fields(cls):
+    """ returns the field names of namedtuples, dataclasses and classes with __slots__, or None for other classes """
+    if is_named_tuple(cls):
+        return tuple(cls._fields)
+    if is_record_class(cls):
+        from dataclasses import fields
+        return tuple(field.name for field in fields(cls))
+    return tuple(slot_names(cls)) or None
+
+
+def classify(cls):
+    """ determines the NodeKind of a type from the abstract base classes it implements """
+    if issubclass(cls, value_sequence_types):
+        if issubclass(cls, MutableSequence):
+            return MUTABLE_VALUE_SEQUENCE_KIND
+        return VALUE_SEQUENCE_KIND
+    if is_named_tuple(cls):
+        return NAMED_TUPLE_KIND
+    if issubclass(cls, Mapping):
+        if issubclass(cls, MutableMapping):
+            return MUTABLE_MAPPING_KIND
+        return MAPPING_KIND
+    if issubclass(cls, Sequence):
+        if issubclass(cls, MutableSequence):
+            return MUTABLE_SEQUENCE_KIND
+        return SEQUENCE_KIND
+    if getattr(cls, "__dictoffset__", 0) or is_record_class(cls):  # instances have a __dict__ or are records
+        return OBJECT_KIND
+    return VALUE_KIND
+
+
+class NodeKinds(dict):
+    """
+    Registry mapping concrete types to their NodeKind, shared by all traversal code.
+
+    Types are classified on first lookup (with 'classify') and after that cost a single dict lookup, instead
+    of the relatively slow isinstance checks against abstract base classes. Types that are not registered with
+    the abstract base classes can be registered explicitly with 'register'; this also applies to subclasses.
+    """
+
+    def __init__(self):
+        super(NodeKinds, self).__init__()
+        self._registered = {}
+
+    def __missing__(self, cls):
+        for base in cls.__mro__:
+            if base in self._registered:
+                kind = self._registered[base]
+                break
+        else:
+            kind = classify(cls)
+        return self.setdefault(cls, kind)
+
+    def register(self, cls, kind):
+        """ registers 'cls' and its subclasses as 'kind', e.g. register(MyDict, MUTABLE_MAPPING_KIND) """
+        if not isinstance(kind, NodeKind):
+            raise TypeError("kind must be a NodeKind, not %s" % type(kind).__name__)
+        self._registered[cls] = kind
+        for sub_cls in [c for c in list(self) if cls in c.__mro__]:
+            self.pop(sub_cls, None)
+
+    def unregister(self, cls):
+        """ removes the explicit registration of 'cls' """
+        del self._registered[cls]
+        for sub_cls in [c for c in list(self) if cls in c.__mro__]:
+            self.pop(sub_cls, None)
+
+
+node_kinds = NodeKinds()
+
+register = node_kinds.register
+
+
+_named_tuple_data = {"_fields", "_field_defaults"}  # class data of all namedtuples, not part of the record
+
+
+def _is_dunder(name):
+    return name.startswith("__") and name.endswith("__")
+
+
+class ObjectSchema(object):
+    """
+    The (non-dunder) attributes of a class, as found by dir(), with their kinds:
+
+     - METHOD: callable class attributes, e.g. methods and nested classes,
+     - DESCRIPTOR: other class attributes with __get__ or __set__, e.g. properties,
+     - CLASS_DATA: all other class attributes.
+
+    Attribute names of instances are the names of the class combined with the names in the instance __dict__,
+    except for records (namedtuples and instances with __slots__ but without __dict__, including slotted
+    dataclasses): their attribute names are the fields that are set, in the order of definition, followed by the
+    other names of the class.
+    """
+
+    __slots__ = ("names", "kinds", "custom_dir", "fields", "other_names")
+
+    def __init__(self, cls):
+        self.kinds = {}
+        for name in dir(cls):
+            if not _is_dunder(name):
+                cls_attr = getattr(cls, name, None)
+                if callable(cls_attr):
+                    self.kinds[name] = METHOD
+                elif hasattr(cls_attr, "__get__") or hasattr(cls_attr, "__set__"):
+                    self.kinds[name] = DESCRIPTOR
+                else:
+                    self.kinds[name] = CLASS_DATA
+        self.names = tuple(self.kinds)  # sorted by dir()
+        self.custom_dir = cls.__dir__ is not object.__dir__
+        self.fields = None if getattr(cls, "__dictoffset__", 0) else record_fields(cls)
+        not_other = set(self.fields or ()) | (_named_tuple_data if is_named_tuple(cls) else set())
+        self.other_names = tuple(name for name in self.names if name not in not_other)  # e.g. properties
+
+    def attribute_names(self, obj):
+        """ returns the non-dunder names in dir(obj), without calling dir() unless the class overrides it """
+        if self.fields is not None:
+            return [name for name in self.fields if hasattr(obj, name)] + list(self.other_names)  # slots can be empty
+        if self.custom_dir:
+            return [name for name in dir(obj) if not _is_dunder(name)]
+        kinds = self.kinds
+        instance_names = [name for name in getattr(obj, "__dict__", ()) if name not in kinds and not _is_dunder(name)]
+        if instance_names:
+            return sorted(self.names + tuple(instance_names))
+        return self.names
+
+
+class ObjectSchemas(WeakKeyDictionary):
+    """
+    Cache of the ObjectSchema of classes, created on first lookup. Classes are held weakly, so they can still
+    be garbage collected. Call 'clear' after adding or removing class attributes of cached classes.
+    """
+
+    def __getitem__(self, cls):
+        try:
+            return super(ObjectSchemas, self).__getitem__(cls)
+        except KeyError:
+            return self.setdefault(cls, ObjectSchema(cls))
+
+
+object_schemas = ObjectSchemas()
@@ -0,0 +1,91 @@
+import sys
+
+from collections import deque
+from itertools import chain, repeat
+
+__author__ = "Lars van Gemerden"
+
+CHUNKS_PER_WORKER = 4  # more chunks than workers, so that workers with faster chunks get more of them
+
+PENDING_PER_WORKER = 2  # tasks submitted ahead by imap_tasks, so workers do not wait for results to be consumed
+
+
+def free_threaded():
+    """ returns whether python runs without the GIL (free-threaded builds), so threads can run in parallel """
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return is_gil_enabled is not None and not is_gil_enabled()
+
+
+def create_executor(workers, threads=False):
+    """ returns a pool of 'workers' processes, or threads if 'threads' is set or python is free-threaded """
+    if threads or free_threaded():
+        from concurrent.futures import ThreadPoolExecutor
+        return ThreadPoolExecutor(workers)
+    from concurrent.futures import ProcessPoolExecutor  # imported when used: it loads multiprocessing
+    return ProcessPoolExecutor(workers)
+
+
+def _get_executor(workers, threads=False):
+    """ returns (executor, number of workers) for 'workers', a number or a concurrent.futures.Executor """
+    from concurrent.futures import Executor
+    if isinstance(workers, Executor):
+        return workers, getattr(workers, "_max_workers", 1)
+    return create_executor(workers, threads), workers
+
+
+def chunked(items, count):
+    """ splits the sequence 'items' into about 'count' consecutive chunks """
+    size = max(1, -(-len(items) // count))
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def map_chunks(function, items, workers, *args, threads=False):
+    """
+    Returns [function(item_chunk, *args)] for consecutive chunks of the sequence 'items', evaluated by a pool
+    of workers, with the results of the chunks concatenated in their original order. 'function' must return a
+    list. 'workers' is the number of workers or a concurrent.futures.Executor (which is not shut down). With
+    processes, 'function', the items and the arguments are pickled, so 'function' must be importable from its
+    module, and the results are copies; with 'threads' a thread pool is used.
+    """
+    executor, count = _get_executor(workers, threads)
+    try:
+        chunks = chunked(items, count * CHUNKS_PER_WORKER)
+        results = executor.map(function, chunks, *[repeat(arg, len(chunks)) for arg in args])
+        return list(chain.from_iterable(results))
+    finally:
+        if executor is not workers:
+            executor.shutdown()
+
+
+def imap_tasks(function, tasks, workers, ordered=True):
+    """
+    Yields the items of the lists returned by function(*task) for the argument tuples in the iterable 'tasks',
+    evaluated by a pool of workers (see map_chunks); with 'ordered' in the order of the tasks, otherwise in the
+    order they are finished. Only a few tasks per worker are pending at a time, so 'tasks' can be a (long)
+    generator and the results can be consumed while the workers continue.
+    """
+    from concurrent.futures import wait, FIRST_COMPLETED
+    executor, count = _get_executor(workers)
+    tasks, pending = iter(tasks), deque()
+    try:
+        while True:
+            for task in tasks:
+                pending.append(executor.submit(function, *task))
+                if len(pending) >= PENDING_PER_WORKER * count:
+                    break
+            if not pending:
+                return
+            if ordered:
+                done = [pending.popleft()]
+            else:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    pending.remove(future)
+            for future in done:
+                for result in future.result():
+                    yield result
+    finally:
+        for future in pending:
+            future.cancel()
+        if executor is not workers:
+            executor.shutdown()
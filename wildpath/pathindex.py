@@ -0,0 +1,252 @@
+from weakref import WeakValueDictionary
+
+from wildpath.compiled import CompiledWildPath, _as_index, _flat_values, _wild_indices
+from wildpath.nodes import node_kinds, MAPPING, SEQUENCE
+from wildpath.paths import Path, WildPath
+from wildpath.tools import _marker
+
+__author__ = "Lars van Gemerden"
+
+
+def _is_indexed(value, node_kinds=node_kinds):
+    kind = node_kinds[type(value)]
+    return kind.read == kind.select == kind.walk and kind.walk in (MAPPING, SEQUENCE)  # e.g. not str or objects
+
+
+def _get_node(value, nodes, new_nodes):
+    """ returns the node of a container in 'nodes' ({id(value): node}) or a new node (added to 'new_nodes') """
+    node = nodes.get(id(value))
+    if node is None:
+        node = _IndexNode(value)
+        if _is_indexed(value):
+            nodes[id(value)] = node
+            new_nodes.append(node)
+    return node
+
+
+class _IndexNode(object):
+    """
+    node of a PathIndex, with the nodes of the items of 'value' if it is a mapping or sequence; there is one
+    node per mapping or sequence, also if it occurs more than once in the object
+    """
+
+    __slots__ = ("value", "children", "selections", "__weakref__")
+
+    max_selections = 64  # wild keys cached per node; the oldest is discarded, so the memory of many queries is bounded
+
+    def __init__(self, value):
+        self.value = value
+        self.children = None  # {key: _IndexNode} or [_IndexNode], set by index()
+        self.selections = None  # {wild key: keys or indices selected by it}, created on first use, see select()
+
+    @classmethod
+    def create(cls, value, nodes):
+        """ returns the (indexed) node for 'value', with the nodes of containers stored in 'nodes' """
+        new_nodes = []
+        node = _get_node(value, nodes, new_nodes)
+        for new_node in new_nodes:  # grows while the new nodes are indexed
+            new_node.index(nodes, new_nodes)
+        return node
+
+    def iter_children(self):
+        children = self.children
+        return iter(children.values() if isinstance(children, dict) else children)
+
+    def index(self, nodes, new_nodes):
+        """ creates the child nodes (with the new nodes added to 'new_nodes' to be indexed) """
+        value = self.value
+        if node_kinds[type(value)].walk == MAPPING:
+            self.children = {k: _get_node(v, nodes, new_nodes) for k, v in value.items()}
+        else:
+            self.children = [_get_node(v, nodes, new_nodes) for v in value]
+        self.selections = None
+
+    def update(self, nodes):
+        """ updates the child nodes after the items of 'value' were changed; nodes of unchanged items are kept """
+        if self.children is not None:
+            new_nodes = [self]
+            for new_node in new_nodes:
+                new_node.index(nodes, new_nodes)
+
+    def select(self, key, expr):
+        """ returns the keys (mapping) or indices (sequence, None if 'expr' does not select indices) for 'expr' """
+        selections = self.selections
+        if selections is None:
+            selections = self.selections = {}
+        try:
+            return selections[key]
+        except KeyError:
+            if len(selections) >= self.max_selections:
+                selections.pop(next(iter(selections)), None)  # the oldest (dicts keep the order of insertion)
+            children = self.children
+            if isinstance(children, dict):
+                selected = selections[key] = expr.keys_in(children)  # same keys, in the same order as the mapping
+            else:
+                selected = selections[key] = _wild_indices(expr, children)
+            return selected
+
+
+class PathIndex(object):
+    """
+    Index over a (static) object, for answering many different (wild) path queries. The object is traversed
+    once, like Path.items(obj, all=True), into a tree of nodes for its mappings and sequences; the keys selected
+    by a wild key are cached per node, so queries only follow the nodes. Other values (objects, strings,
+    ...) are not indexed: the rest of a query is evaluated on them with get_in. The results are the same as
+    those of get_in on the object, as long as the object is not changed (see TrackedDocument).
+    """
+
+    def __init__(self, obj):
+        self.root = _IndexNode.create(obj, {})
+
+    @property
+    def obj(self):
+        return self.root.value
+
+    @staticmethod
+    def _as_path(path):
+        return WildPath(path) if isinstance(path, str) else path
+
+    @staticmethod
+    def _steps(path):
+        compiled = path.compile()
+        if isinstance(compiled, CompiledWildPath):
+            return compiled.steps
+        return [(key, _as_index(key), None) for key in path]
+
+    def get_in(self, path, default=_marker, flat=False):
+        """ returns path.get_in(obj, default, flat) for the indexed object; strings are converted to WildPath """
+        path = self._as_path(path)
+        result = self._get_in(path, default)
+        if flat and isinstance(path, WildPath):
+            return list(_flat_values(result, path.compile().depth))
+        return result
+
+    def has_in(self, path):
+        try:
+            self._get_in(self._as_path(path))
+        except (KeyError, IndexError, AttributeError):
+            return False
+        return True
+
+    def _get_in(self, path, default=_marker):
+        steps = self._steps(path)
+        last = len(steps)
+        root = [None]
+        stack = [(root, 0, self.root, 0)]
+        push, pop = stack.append, stack.pop
+        while stack:
+            parent, slot, node, i = pop()
+            while i < last:  # plain keys are followed in place
+                key, index, expr = steps[i]
+                children = node.children
+                if expr is not None or children is None or (index is None and not isinstance(children, dict)):
+                    break
+                try:
+                    node = children[key if isinstance(children, dict) else index]
+                except (KeyError, IndexError):
+                    if default is _marker:
+                        raise
+                    node, i = None, last
+                    break
+                i += 1
+            if i == last:
+                parent[slot] = default if node is None else node.value
+                continue
+            key, index, expr = steps[i]
+            children = node.children
+            selected = None if expr is None or children is None else node.select(key, expr)
+            if selected is None:  # not indexed: the rest of the path is evaluated on the value
+                parent[slot] = path[i:].compile().get_in(node.value, default)
+                continue
+            if isinstance(children, dict):
+                result = dict.fromkeys(selected)
+                items = [(k, children[k]) for k in selected]
+            else:
+                result = [None] * len(selected)
+                items = [(j, children[index]) for j, index in enumerate(selected)]
+            parent[slot] = result
+            if i + 1 == last:
+                for k, child in items:
+                    result[k] = child.value
+            else:
+                for k, child in reversed(items):
+                    push((result, k, child, i + 1))
+        return root[0]
+
+
+class TrackedDocument(PathIndex):
+    """
+    PathIndex of an object that is changed through the index: set_in, del_in and pop_in change the object
+    like the methods of Path and WildPath, and then update the nodes of the containers that were changed
+    (the items at path[:-1]), so the index stays valid without indexing the object again. With 'verify',
+    the index is compared to a new index of the object after every change (see verify(); slow, for tests).
+    Containers that occur more than once in the object (e.g. after set_in with a wild path) share a node, so
+    a change through one of the paths to them is seen at all of them.
+    """
+
+    def __init__(self, obj, verify=False):
+        self.nodes = WeakValueDictionary()  # {id(container): node}: the nodes of removed containers are discarded
+        self.root = _IndexNode.create(obj, self.nodes)
+        self.verify_changes = verify
+
+    def set_in(self, path, value):
+        path = self._as_path(path)
+        self._change(path, path.set_in, value)
+
+    def del_in(self, path):
+        path = self._as_path(path)
+        self._change(path, path.del_in)
+
+    def pop_in(self, path):
+        path = self._as_path(path)
+        return self._change(path, path.pop_in)
+
+    def _change(self, path, method, *args):
+        nodes = self._parent_nodes(self._steps(path))
+        try:
+            return method(self.obj, *args)
+        finally:  # also after an error, since the change might be partial
+            for node in nodes:
+                node.update(self.nodes)
+            if self.verify_changes:
+                self.verify()
+
+    def _parent_nodes(self, steps):
+        """ returns the (indexed) nodes at steps[:-1]: the containers that are changed by set_in or del_in """
+        nodes = [self.root]
+        for key, index, expr in steps[:-1]:
+            parents, nodes = nodes, []
+            for node in parents:
+                children = node.children
+                if children is None:  # not indexed, so there are no nodes to update below it
+                    continue
+                if expr is not None:
+                    selected = node.select(key, expr)
+                    if selected is not None:
+                        nodes.extend(children[k] for k in selected)
+                elif isinstance(children, dict):
+                    if key in children:
+                        nodes.append(children[key])
+                elif index is not None and -len(children) <= index < len(children):
+                    nodes.append(children[index])
+        return {id(node): node for node in nodes}.values()  # a node can be selected more than once (e.g. "0|-1")
+
+    def verify(self):
+        """ raises AssertionError if the index does not match a new index of the object """
+        stack = [((), self.root, _IndexNode.create(self.obj, {}))]
+        checked = set()  # (node, new node) pairs, for containers that occur more than once
+        while stack:
+            keys, node, new = stack.pop()
+            if (id(node), id(new)) in checked:
+                continue
+            checked.add((id(node), id(new)))
+            if node.value is not new.value or type(node.children) is not type(new.children):
+                raise AssertionError("index differs from the object at '%s'" % Path.from_parts(keys))
+            if isinstance(new.children, dict):
+                if list(node.children) != list(new.children):
+                    raise AssertionError("index has other keys than the object at '%s'" % Path.from_parts(keys))
+                stack.extend((keys + (str(k),), node.children[k], new.children[k]) for k in new.children)
+            elif new.children is not None:
+                if len(node.children) != len(new.children):
+                    raise AssertionError("index has other items than the object at '%s'" % Path.from_parts(keys))
+                stack.extend((keys + (str(i),), n, m) for i, (n, m) in enumerate(zip(node.children, new.children)))
@@ -1,70 +1,198 @@
+from collections import deque
 from copy import copy
-from typing import Mapping, Sequence, MutableMapping, MutableSequence
 
+from wildpath.cache import LRUCache
 from wildpath.keyparser import KeyParser
-from wildpath.tools import value_sequence_types, flatten
+from wildpath.columns import build_array, _missing
+from wildpath.jsonstream import iter_json, CHUNK_SIZE
+from wildpath.compiled import CompiledPath, CompiledWildPath
+from wildpath.parallel import map_chunks
+from wildpath.nodes import node_kinds, object_schemas, LEAF, OBJECT, MAPPING, SEQUENCE, DESCRIPTOR
+from wildpath.tools import _marker
 
 __author__ = "Lars van Gemerden"
 
-_marker = object()
+
+def _index_parts(index):
+    return (str(index),)
+
+
+def _sub_items(keys, items, key_parts):
+    """ yields (keys, value) for the (key, value) items of a node with 'keys' """
+    for key, value in items:
+        yield keys + key_parts(key), value
+
+
+def _matching_items(obj, walk, step, get_object_names):
+    """ returns the (key, value) items of 'obj' selected by a step of a compiled WildPath, in the order of 'obj' """
+    key, index, expr = step
+    if walk == SEQUENCE:
+        if expr is None:
+            if index is None or not -len(obj) <= index < len(obj):
+                return []
+            return [(index % len(obj), obj[index])]
+        try:
+            indices = expr.indices(len(obj))
+        except ValueError:  # e.g. "a*", which does not select indices
+            return []
+        if not (isinstance(indices, range) and indices.step > 0):
+            indices = sorted(indices)
+        return [(i, obj[i]) for i in indices]
+    if walk == OBJECT:  # attributes are only looked up when they are selected
+        names = dict.fromkeys(get_object_names(obj))
+        selected = [key] if expr is None else expr.keys_in(names)
+        if len(selected) > 1:
+            selected = set(selected)
+            return [(name, getattr(obj, name)) for name in names if name in selected]
+        return [(name, getattr(obj, name)) for name in selected if name in names]
+    if expr is None:
+        return [(key, obj[key])] if key in obj else []
+    selected = expr.keys_in(obj)
+    if len(selected) > 1:
+        selected = set(selected)
+        return [(k, v) for k, v in obj.items() if k in selected]
+    return [(k, obj[k]) for k in selected]
+
+
+def _items_chunk(children, cls, all, max_depth):
+    """ returns the items of the (keys, child) items of the root of an object, in a worker (see BasePath.items) """
+    sub_depth = None if max_depth is None else max_depth - 1
+    result = []
+    for keys, child in children:
+        if all:
+            result.append((keys, copy(child)))
+        result.extend((keys + tuple(path), value) for path, value in cls.items(child, all=all, max_depth=sub_depth))
+    return result
+
+
+def _call_chunk(methods, args, kwargs):
+    return [method(*args, **kwargs) for method in methods]
+
+
+def _parse_key(cls_key):
+    """ factory of WildPath.key_cache, for keys (cls, wild_key) """
+    cls, wild_key = cls_key
+    return cls.algebra.parse(wild_key, simplify=True)
+
+
+def _compile_path(cls_path):
+    """ factory of WildPath.plan_cache, for keys (cls, path) """
+    return cls_path[1]._compile()
 
 
 class BasePath(tuple):
     """
     Classes to be able to use '.' separated paths to access elements in objects, lists and dictionaries.
     """
+    __slots__ = ()
+
     sep = "."
 
+    _interned = {}  # {class: {string: path}}, see intern()
+
+    intern_limit = 65536  # the interned paths of a class are discarded when there are more
+
+    @classmethod
+    def _get_object_names(cls, obj):
+        """ names of the attributes of 'obj' iterated over by 'items' """
+        schema = object_schemas[obj.__class__]
+        kinds, obj_dict = schema.kinds, getattr(obj, "__dict__", {})
+        return [name for name in schema.attribute_names(obj) if name in obj_dict or kinds.get(name) == DESCRIPTOR]
+
     @classmethod
     def _get_object_items(cls, obj, _call=False):
-        for name in dir(obj):
-            if not (name.startswith("__") and name.endswith("__")):
+        schema = object_schemas[obj.__class__]
+        kinds, obj_dict = schema.kinds, getattr(obj, "__dict__", {})
+        for name in schema.attribute_names(obj):
+            if name in obj_dict or kinds.get(name) == DESCRIPTOR:
+                yield name, getattr(obj, name)
+            elif _call:
                 attr = getattr(obj, name)
-                if name in obj.__dict__ or (_call and callable(attr)):
+                if callable(attr):
                     yield name, attr
-                else:
-                    cls_attr = getattr(obj.__class__, name, None)
-                    if not callable(cls_attr):
-                        if (isinstance(cls_attr, property) or
-                                hasattr(cls_attr, "__get__") or
-                                hasattr(cls_attr, "__set__")):
-                            yield name, attr
 
     @classmethod
-    def items(cls, obj, all=False, _path=None, _call=False):
-        """ iterates over all (wildpath, value) items in the (nested) object """
-        if _path is None:
-            _path = cls()
-        elif all:
-            yield _path, copy(obj)
-        if _call and callable(obj):
-            yield _path, obj
-        elif isinstance(obj, value_sequence_types):
-            if not all:
-                yield _path, obj
-        elif isinstance(obj, Mapping):
-            for key, sub_obj in obj.items():
-                for sub_path, sub_obj in cls.items(sub_obj, all, _path + cls(key), _call=_call):
-                    yield sub_path, sub_obj
-        elif isinstance(obj, Sequence):
-            for index, sub_obj in enumerate(obj):
-                for sub_path, sub_obj in cls.items(sub_obj, all, _path + cls(str(index)), _call=_call):
-                    yield sub_path, sub_obj
-        elif hasattr(obj, "__dict__"):
-            for key, sub_obj in cls._get_object_items(obj, _call):
-                for sub_path, sub_obj in cls.items(sub_obj, all, _path + cls(key), _call=_call):
-                    yield sub_path, sub_obj
-        elif not all:
-            yield _path, obj
+    def _key_parts(cls, key):
+        """ the keys of a mapping are added to a path like Path(key), so str keys containing 'sep' are split """
+        if isinstance(key, str) and cls.sep not in key:
+            return (key,)
+        return tuple(cls(key))
 
     @classmethod
-    def paths(cls, obj, all=False):
-        for sub_path, _ in cls.items(obj, all=all):
+    def items(cls, obj, all=False, breadth_first=False, max_depth=None, match=None, _call=False, workers=None):
+        """
+        iterates over all (path, value) items in the (nested) object, depth first (the order of the object) or
+        breadth first; with 'max_depth' values at that depth are not iterated into, but returned as values.
+        With 'match' (a WildPath or string) only the items at or below the locations matching 'match' are
+        produced, and parts of the object that cannot match are skipped. With 'workers' (depth first, without
+        'match') the items under the top level items of the object are collected by a pool of workers.
+        """
+        if workers is not None and not (breadth_first or match is not None or _call):
+            for item in cls._parallel_items(obj, all, max_depth, workers):
+                yield item
+            return
+        from_parts, key_parts, get_object_items = cls.from_parts, cls._key_parts, cls._get_object_items
+        get_object_names = cls._get_object_names
+        if match is None:
+            steps = ()
+        else:
+            steps = (match if isinstance(match, WildPath) else WildPath(match)).compile().steps
+        min_length = max(len(steps), 1)  # of the paths produced with 'all'
+        nodes = deque([iter([((), obj)])])  # iterators over (keys, value) items, used as stack or queue
+        current = nodes.popleft if breadth_first else nodes.pop  # removes the current iterator
+        index = 0 if breadth_first else -1  # position of the current iterator
+        while nodes:
+            for keys, obj in nodes[index]:
+                break
+            else:
+                current()
+                continue
+            if all and len(keys) >= min_length:
+                yield from_parts(keys), copy(obj)
+            if _call and callable(obj):
+                yield from_parts(keys), obj
+                continue
+            walk = node_kinds[type(obj)].walk
+            if max_depth is not None and len(keys) >= max_depth:
+                walk = LEAF
+            if len(keys) < len(steps):  # only the items selected by the next step of 'match'
+                if walk != LEAF:
+                    items = _matching_items(obj, walk, steps[len(keys)], get_object_names)
+                    nodes.append(_sub_items(keys, items, _index_parts if walk == SEQUENCE else key_parts))
+            elif walk == MAPPING:
+                nodes.append(_sub_items(keys, obj.items(), key_parts))
+            elif walk == SEQUENCE:
+                nodes.append(_sub_items(keys, enumerate(obj), _index_parts))
+            elif walk == OBJECT:
+                nodes.append(_sub_items(keys, get_object_items(obj, _call), key_parts))
+            elif not all:
+                yield from_parts(keys), obj
+
+    @classmethod
+    def _parallel_items(cls, obj, all, max_depth, workers):
+        walk = node_kinds[type(obj)].walk
+        if walk == LEAF or max_depth == 0:
+            return cls.items(obj, all=all, max_depth=max_depth)
+        if walk == MAPPING:
+            children = [(cls._key_parts(key), value) for key, value in obj.items()]
+        elif walk == SEQUENCE:
+            children = [(_index_parts(index), value) for index, value in enumerate(obj)]
+        else:
+            children = [(cls._key_parts(name), value) for name, value in cls._get_object_items(obj)]
+        from_parts = cls.from_parts
+        return [(from_parts(keys), value) for keys, value in map_chunks(_items_chunk, children, workers,
+                                                                         cls, all, max_depth)]
+
+    @classmethod
+    def paths(cls, obj, all=False, breadth_first=False, max_depth=None, match=None, workers=None):
+        for sub_path, _ in cls.items(obj, all=all, breadth_first=breadth_first, max_depth=max_depth, match=match,
+                                     workers=workers):
             yield sub_path
 
     @classmethod
-    def values(cls, obj, all=False):
-        for _, sub_obj in cls.items(obj, all=all):
+    def values(cls, obj, all=False, breadth_first=False, max_depth=None, match=None, workers=None):
+        for _, sub_obj in cls.items(obj, all=all, breadth_first=breadth_first, max_depth=max_depth, match=match,
+                                    workers=workers):
             yield sub_obj
 
     def __new__(cls, string_or_seq=None):
@@ -74,9 +202,25 @@ class BasePath(tuple):
         else:
             return tuple.__new__(cls, string_or_seq)
 
+    @classmethod
+    def from_parts(cls, parts):
+        """ creates a path directly from an iterable of keys, without parsing """
+        return tuple.__new__(cls, parts)
+
+    @classmethod
+    def intern(cls, string):
+        """ returns a shared, pre-split path for 'string'; for code that creates the same paths from strings repeatedly """
+        try:
+            return cls._interned[cls][string]
+        except KeyError:
+            table = cls._interned.setdefault(cls, {})
+            if len(table) >= cls.intern_limit:
+                table.clear()
+            return table.setdefault(string, cls(string))
+
     def __getitem__(self, key):
         if isinstance(key, slice):
-            return self.__class__(tuple.__getitem__(self, key))
+            return self.from_parts(tuple.__getitem__(self, key))
         return tuple.__getitem__(self, key)
 
     def get_in(self, obj, default=_marker):
@@ -93,6 +237,17 @@ class BasePath(tuple):
         self._del_in(obj)
         return result
 
+    def get_many(self, records, default=_marker, column=False):
+        """
+        returns the results of get_in(record, default) for all records in a list; the path is prepared once
+        for all records. With 'column' the values found in all records are gathered into one flat list.
+        """
+        return list(self.iter_many(records, default, column))
+
+    def iter_many(self, records, default=_marker, column=False):
+        """ like get_many, but yields the results """
+        raise NotImplementedError
+
     def has_in(self, obj):
         """checks presence of item at wildpath 'self' from the 'obj'"""
         try:
@@ -114,7 +269,7 @@ class BasePath(tuple):
         raise NotImplementedError
 
     def __add__(self, other):
-        return self.__class__(tuple.__add__(self, other))
+        return self.from_parts(tuple.__add__(self, other))
 
     def __str__(self):
         return self.sep.join(str(v) for v in self)
@@ -125,16 +280,42 @@ class Path(BasePath):
     Fast implementation of the baseclass that does not allow wildcards and slicing.
     """
 
+    def __str__(self):
+        try:
+            return self._string
+        except AttributeError:
+            self._string = string = super(Path, self).__str__()  # cached: paths are immutable
+            return string
+
     def call_in(self, obj, *args, **kwargs):
         return self.get_in(obj)(*args, **kwargs)
 
-    def _get_in(self, obj, default=_marker):
+    def compile(self):
+        """ returns a reusable accessor with the same get/set/del methods, for paths used many times """
+        return CompiledPath(self)
+
+    def iter_many(self, records, default=_marker, column=False):
+        return self.compile().iter_many(records, default)  # every record has one value: already a column
+
+    def get_json(self, fp, default=_marker):
+        """
+        returns the item at path 'self' in the JSON document in file 'fp' (text or binary), reading the file
+        incrementally and decoding only the item; raises KeyError if it is not found and no default is given
+        """
+        for _, value in iter_json(fp, self):
+            return value
+        if default is _marker:
+            raise KeyError("%s not found in JSON" % (self,))
+        return default
+
+    def _get_in(self, obj, default=_marker, node_kinds=node_kinds):
         """returns item at wildpath 'self' from the 'obj'"""
         try:
             for key in self:
-                if isinstance(obj, Mapping):
+                read = node_kinds[type(obj)].read
+                if read == MAPPING:
                     obj = obj[key]
-                elif isinstance(obj, Sequence):
+                elif read == SEQUENCE:
                     try:
                         index = int(key)
                     except ValueError:
@@ -153,9 +334,10 @@ class Path(BasePath):
     def _set_in(self, obj, value):
         """sets item at wildpath 'self' from the 'obj' to 'value'"""
         obj = self[:-1]._get_in(obj)
-        if isinstance(obj, MutableMapping):
+        write = node_kinds[type(obj)].write
+        if write == MAPPING:
             obj[self[-1]] = value
-        elif isinstance(obj, MutableSequence):
+        elif write == SEQUENCE:
             try:
                 index = int(self[-1])
             except ValueError:
@@ -168,9 +350,10 @@ class Path(BasePath):
     def _del_in(self, obj):
         """deletes item at wildpath 'self' from the 'obj'"""
         obj = self[:-1]._get_in(obj)
-        if isinstance(obj, MutableMapping):
+        write = node_kinds[type(obj)].write
+        if write == MAPPING:
             del obj[self[-1]]
-        elif isinstance(obj, MutableSequence):
+        elif write == SEQUENCE:
             try:
                 index = int(self[-1])
             except ValueError:
@@ -181,261 +364,133 @@ class Path(BasePath):
             delattr(obj, self[-1])
 
 
-def _get_object_dict(obj):
-    return {name: getattr(obj, name) for name in dir(obj) if not (name.startswith("__") and name.endswith("__"))
-            and not callable(getattr(obj.__class__, name, None))}
-
-
-def _get_with_key(value, k):
-    if isinstance(value, Mapping):
-        return value[k]
-    return value
-
-
-def _get_with_index(value, index):
-    if isinstance(value, value_sequence_types):
-        return value
-    if isinstance(value, Sequence):
-        return value[index]
-    return value
-
-
 class WildPath(BasePath):
     """
     Implementation of the baseclass that allows for wildcards, multiple keys and slicing.
     """
 
+    __slots__ = ()
+
     sep = "."
 
     tokens = "!&|*?:"
 
     algebra = KeyParser()
 
-    _preprocessed = {}
+    #  keyed by (class, key or path), so subclasses with another 'sep' or 'algebra' do not share parsed keys and plans;
+    #  the sizes can be changed with e.g. WildPath.plan_cache.resize(n); plans keep their parsed keys, so the plan
+    #  cache has the same size as the key cache, to keep the memory of many different (e.g. user supplied) paths bounded
+    key_cache = LRUCache(maxsize=4096)  # parsed wild keys
+    plan_cache = LRUCache(maxsize=key_cache.maxsize)  # compiled paths; instances have no __dict__ to keep them
 
-    def __new__(cls, string_or_seq=None, _parse=algebra.parse, _tokens=tokens, preprocessed=_preprocessed):
+    def __new__(cls, string_or_seq=None):
         self = super(WildPath, cls).__new__(cls, string_or_seq)
+        #  if wild_cards or slicing are used, multiple results are returned and the boolean logic is applied
         for wild_key in self:
-            #  if wild_cards or slicing are used, multiple results are returned and the boolean logic is applied
-            if wild_key not in preprocessed and any(t in wild_key for t in _tokens):
-                preprocessed[wild_key] = _parse(wild_key, simplify=True)
-        self.depth = self._get_depth()
+            cls._parse_key(wild_key)
         return self
 
-    def _get_depth(self):
-        prep = self._preprocessed
-        return len([k for k in self if k in prep]) - 1
+    @property
+    def depth(self):
+        return self.compile().depth
 
-    def call_in(self, obj, *args, **kwargs):
+    @classmethod
+    def _parse_key(cls, wild_key):
+        """ returns the parsed (cached) key, or None for a key without wildcards, slicing or boolean logic """
+        for token in cls.tokens:
+            if token in wild_key:
+                return cls.key_cache.get_or_create((cls, wild_key), _parse_key)
+        return None
+
+    def call_in(self, obj, *args, workers=None, **kwargs):
+        """ with 'workers' the methods are called by a pool of threads, since they must run on 'obj' itself """
         results = self.get_in(obj)
+        if workers is not None:
+            methods = list(Path.items(results, _call=True))
+            values = map_chunks(_call_chunk, [method for _, method in methods], workers, args, kwargs, threads=True)
+            for (path, _), value in zip(methods, values):
+                path.set_in(results, value)
+            return results
         for path, instance_method in Path.items(results, _call=True):
             path.set_in(results, instance_method(*args, **kwargs))
         return results
 
-    def get_in(self, obj, default=_marker, flat=False):
-        result = super(WildPath, self).get_in(obj, default)
+    def get_in(self, obj, default=_marker, flat=False, flat_iter=False, workers=None):
+        """
+        with 'flat' the result is a flat list of the values; with 'flat_iter' an iterator over these values.
+        With 'workers' (a number or a concurrent.futures.Executor) the items selected by the first wild key
+        are evaluated in chunks by a pool of processes (threads on free-threaded python); the values are copies.
+        """
+        if workers is not None:
+            return self.compile().get_in(obj, default, flat, flat_iter, workers)
+        if flat_iter:
+            return self.iter_flat_in(obj, default)
         if flat:
-            return flatten(result, depth=self.depth)
-        return result
+            return list(self.iter_flat_in(obj, default))
+        return super(WildPath, self).get_in(obj, default)
+
+    def iter_many(self, records, default=_marker, column=False, flat=False):
+        return self.compile().iter_many(records, default, flat, column)
+
+    def get_many(self, records, default=_marker, column=False, flat=False):
+        """ see BasePath.get_many; with 'flat' the result for each record is flattened as in get_in """
+        return list(self.iter_many(records, default, column, flat))
+
+    def iter_flat_in(self, obj, default=_marker):
+        """ yields the values of get_in(obj, default, flat=True) during the traversal, without building the result """
+        return self.compile().iter_flat_in(obj, default)
+
+    def iter_json(self, fp, chunk_size=CHUNK_SIZE):
+        """
+        yields (path, value) for the items at wildpath 'self' in the JSON document in file 'fp' (text or binary),
+        in the order of the document. The file is read incrementally: only the matching values are decoded and
+        the rest of the document is skipped, so the memory use depends on the largest match, not on the file.
+        """
+        for keys, value in iter_json(fp, self, chunk_size):
+            yield Path.from_parts(keys), value
+
+    def to_array(self, obj, dtype="d", fill_value=0):
+        """
+        returns the values of get_in(obj, flat=True) as an array (see wildpath.columns.build_array): a masked
+        numpy array, or MaskedArray(data, mask) of array.array's without numpy. Missing items and None are masked.
+        """
+        return build_array(self.compile().iter_flat_in(obj, _missing), dtype, fill_value)
+
+    @classmethod
+    def to_columns(cls, obj, paths, dtype="d", fill_value=0):
+        """
+        returns {name: array} for a mapping {name: path}, with the arrays built by path.to_array(obj); 'dtype'
+        can also be a mapping {name: dtype}.
+        """
+        columns = {}
+        for name, path in paths.items():
+            column_dtype = dtype.get(name, "d") if isinstance(dtype, dict) else dtype
+            columns[name] = (path if isinstance(path, cls) else cls(path)).to_array(obj, column_dtype, fill_value)
+        return columns
+
+    def iter_in(self, obj):
+        """ yields (path, value) for every item at wildpath 'self' in 'obj', lazily and in the order of get_in """
+        for keys, value in self.compile().iter_in(obj):
+            yield Path.from_parts(keys), value
+
+    def compile(self):
+        """ returns the evaluation plan of this path; it is built once and used by get_in, set_in and del_in """
+        return self.plan_cache.get_or_create((self.__class__, self), _compile_path)
+
+    def _compile(self):
+        return CompiledWildPath(self, [self._parse_key(wild_key) for wild_key in self])
 
-    def _get_in(self, obj, default=_marker, get_object_dict=_get_object_dict,
-                preprocessed=_preprocessed):
+    def _get_in(self, obj, default=_marker):
         """returns item(s) at wildpath 'self' from the 'obj'"""
-        if not len(self):
-            return obj
-        key = self[0]
-        if key in preprocessed:  # this is not a single key or index
-            if len(self) == 1:
-                if isinstance(obj, Mapping):
-                    return {k: obj[k] for k in preprocessed[key](*obj)}
-                elif isinstance(obj, Sequence):
-                    try:
-                        indices = preprocessed[key](*range(len(obj)))
-                    except ValueError:
-                        obj_dict = get_object_dict(obj)
-                        return {k: obj_dict[k] for k in preprocessed[key](*obj_dict)}
-                    else:
-                        return [obj[i] for i in indices]
-                else:
-                    obj_dict = get_object_dict(obj)
-                    return {k: obj_dict[k] for k in preprocessed[key](*obj_dict)}
-            else:
-                if isinstance(obj, Mapping):
-                    return {k: self[1:]._get_in(obj[k], default) for k in preprocessed[key](*obj)}
-                elif isinstance(obj, Sequence):
-                    try:
-                        indices = preprocessed[key](*range(len(obj)))
-                    except ValueError:
-                        obj_dict = get_object_dict(obj)
-                        return {k: self[1:]._get_in(obj_dict[k], default) for k in preprocessed[key](*obj_dict)}
-                    else:
-                        return [self[1:].get_in(obj[i], default) for i in indices]
-                else:
-                    obj_dict = get_object_dict(obj)
-                    return {k: self[1:]._get_in(obj_dict[k], default) for k in preprocessed[key](*obj_dict)}
-        else:
-            try:
-                if len(self) == 1:
-                    if isinstance(obj, Mapping):
-                        return obj[key]
-                    elif isinstance(obj, Sequence):
-                        try:
-                            index = int(key)
-                        except ValueError:
-                            return getattr(obj, key)
-                        else:
-                            return obj[index]
-                    else:
-                        return getattr(obj, key)
-                else:
-                    if isinstance(obj, Mapping):
-                        return self[1:]._get_in(obj[key], default)
-                    elif isinstance(obj, Sequence):
-                        try:
-                            index = int(key)
-                        except ValueError:
-                            return self[1:]._get_in(getattr(obj, key), default)
-                        else:
-                            return self[1:]._get_in(obj[index], default)
-                    else:
-                        return self[1:]._get_in(getattr(obj, key), default)
-            except (KeyError, IndexError, AttributeError):
-                if default is _marker:
-                    raise
-                return default
-
-    def _set_in(self, obj, value, get_object_dict=_get_object_dict,
-                get_with_key=_get_with_key,  # speed up function access
-                get_with_index=_get_with_index,
-                preprocessed=_preprocessed):
+        return self.compile()._get_in(obj, default)
+
+    def _set_in(self, obj, value):
         """sets item(s) at wildpath 'self' of 'obj' to 'value'"""
-        key = self[0]
-        if key in preprocessed:
-            if len(self) == 1:
-                if isinstance(obj, MutableMapping):
-                    for k in preprocessed[key](*obj):
-                        obj[k] = get_with_key(value, k)
-                elif isinstance(obj, MutableSequence):
-                    try:
-                        indices = preprocessed[key](*range(len(obj)))
-                    except ValueError:
-                        for k in preprocessed[key](*get_object_dict(obj)):
-                            setattr(obj, k, get_with_key(value, k))
-                    else:
-                        for i, j in enumerate(indices):
-                            obj[j] = get_with_index(value, i)
-                else:
-                    for k in preprocessed[key](*get_object_dict(obj)):
-                        setattr(obj, k, get_with_key(value, k))
-            else:
-                if isinstance(obj, MutableMapping):
-                    for k in preprocessed[key](*obj):
-                        self[1:]._set_in(obj[k], get_with_key(value, k))
-                elif isinstance(obj, MutableSequence):
-                    try:
-                        indices = preprocessed[key](*range(len(obj)))
-                    except ValueError:
-                        obj_dict = get_object_dict(obj)
-                        for k in preprocessed[key](*obj_dict):
-                            self[1:]._set_in(obj_dict[k], _get_with_key(value, k))
-                    else:
-                        for i, j in enumerate(indices):
-                            self[1:]._set_in(obj[j], _get_with_index(value, i))
-                else:
-                    obj_dict = get_object_dict(obj)
-                    for k in preprocessed[key](*obj_dict):
-                        self[1:]._set_in(obj_dict[k], _get_with_key(value, k))
-        else:
-            if len(self) == 1:
-                if isinstance(obj, MutableMapping):
-                    obj[key] = value
-                elif isinstance(obj, MutableSequence):
-                    try:
-                        index = int(key)
-                    except ValueError:
-                        setattr(obj, key, value)
-                    else:
-                        obj[index] = value
-                else:
-                    setattr(obj, key, value)
-            else:
-                if isinstance(obj, MutableMapping):
-                    self[1:]._set_in(obj[key], _get_with_key(value, key))
-                elif isinstance(obj, MutableSequence):
-                    try:
-                        index = int(key)
-                    except ValueError:
-                        self[1:]._set_in(getattr(obj, key), _get_with_key(value, key))
-                    else:
-                        self[1:]._set_in(obj[index], _get_with_index(value, index))
-                else:
-                    self[1:]._set_in(getattr(obj, key), _get_with_key(value, key))
+        self.compile()._set_in(obj, value)
 
-    def _del_in(self, obj, get_object_dict=_get_object_dict,
-                preprocessed=_preprocessed):
+    def _del_in(self, obj):
         """deletes item(s) at wildpath 'self' from the 'obj'"""
-        key = self[0]
-        if key in preprocessed:
-            if len(self) == 1:
-                if isinstance(obj, MutableMapping):
-                    for k in preprocessed[key](*obj):
-                        del obj[k]
-                elif isinstance(obj, MutableSequence):
-                    try:
-                        indices = preprocessed[key](*range(len(obj)))
-                    except ValueError:
-                        for k in preprocessed[key](*get_object_dict(obj)):
-                            delattr(obj, k)
-                    else:
-                        for i in indices:
-                            obj[i] = _marker  # marked for deletion
-                        obj[:] = [v for v in obj if v is not _marker]
-                else:
-                    for k in preprocessed[key](*get_object_dict(obj)):
-                        delattr(obj, k)
-            else:
-                if isinstance(obj, MutableMapping):
-                    for k in preprocessed[key](*obj):
-                        self[1:]._del_in(obj[k])
-                elif isinstance(obj, MutableSequence):
-                    try:
-                        indices = preprocessed[key](*range(len(obj)))
-                    except ValueError:
-                        obj_dict = get_object_dict(obj)
-                        for k in preprocessed[key](*obj_dict):
-                            self[1:]._del_in(obj_dict[k])
-                    else:
-                        for i in indices:
-                            self[1:]._del_in(obj[i])
-                else:
-                    obj_dict = get_object_dict(obj)
-                    for k in preprocessed[key](*obj_dict):
-                        self[1:]._del_in(obj_dict[k])
-        else:
-            if len(self) == 1:
-                if isinstance(obj, MutableMapping):
-                    del obj[key]
-                elif isinstance(obj, MutableSequence):
-                    try:
-                        index = int(key)
-                    except ValueError:
-                        delattr(obj, key)
-                    else:
-                        del obj[index]
-                else:
-                    delattr(obj, key)
-            else:
-                if isinstance(obj, MutableMapping):
-                    self[1:]._del_in(obj[key])
-                elif isinstance(obj, MutableSequence):
-                    try:
-                        index = int(key)
-                    except ValueError:
-                        self[1:]._del_in(getattr(obj, key))
-                    else:
-                        self[1:]._del_in(obj[index])
-                else:
-                    self[1:]._del_in(getattr(obj, key))
+        self.compile()._del_in(obj)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,125 @@
+from operator import itemgetter
+
+from wildpath.compiled import _as_index, _attr_getter
+from wildpath.nodes import node_kinds, MAPPING, SEQUENCE
+from wildpath.paths import Path, WildPath
+from wildpath.tools import _marker
+
+__author__ = "Lars van Gemerden"
+
+
+class _Node(object):
+    """ node in the prefix trie of a PathSet; the edge to the node is a plain key of the paths """
+
+    __slots__ = ("key", "index", "children", "ends", "tails", "cache")
+
+    def __init__(self, key=None):
+        self.key = key
+        self.index = None if key is None else _as_index(key)
+        self.children = {}  # {key: _Node}
+        self.ends = []  # [(result key, default, wild)] of the paths ending here; 'wild' for WildPath instances
+        self.tails = []  # [(result key, compiled wild rest of the path, default)] of the wild paths continuing here
+        self.cache = (None, None)  # (type, getter) of the last object the key was looked up in
+
+    def get(self, obj, node_kinds=node_kinds):
+        cls, getter = self.cache
+        if type(obj) is not cls:
+            read = node_kinds[type(obj)].read
+            if read == MAPPING:
+                getter = itemgetter(self.key)
+            elif read == SEQUENCE and self.index is not None:
+                getter = itemgetter(self.index)
+            else:
+                getter = _attr_getter(self.key)
+            self.cache = (type(obj), getter)
+        return getter(obj)
+
+    def iter_paths(self):
+        """ yields (result key, default, wild) for all paths in the subtrie """
+        nodes = [self]
+        while nodes:
+            node = nodes.pop()
+            for path, default, wild in node.ends:
+                yield path, default, wild
+            for path, _, default in node.tails:
+                yield path, default, True
+            nodes.extend(node.children.values())
+
+
+class PathSet(object):
+    """
+    Set of paths (Path or WildPath) that are looked up together, in a single traversal of the object.
+
+    The plain keys at the start of the paths are merged into a prefix trie, so a shared prefix (like
+    'routes.0.legs.0') is looked up once for all paths that start with it. Wild paths follow the trie up
+    to their first wild key and are evaluated from there. 'paths' can be an iterable of paths or a mapping
+    of paths to their defaults; strings are converted to WildPath if they contain wild keys, and to Path
+    otherwise (the results are keyed by the paths as they were given). Paths without a default use 'default';
+    if that is not given either, a missing item raises KeyError, IndexError or AttributeError, like get_in.
+    """
+
+    def __init__(self, paths, default=_marker):
+        if hasattr(paths, "items"):
+            items = list(paths.items())
+        else:
+            items = [(path, default) for path in paths]
+        self.paths = tuple(path for path, _ in items)
+        self._root = _Node()
+        for path, path_default in items:
+            self._add(path, path_default)
+
+    @staticmethod
+    def _as_path(path):
+        if isinstance(path, str):
+            if any(token in path for token in WildPath.tokens):
+                return WildPath(path)
+            return Path(path)
+        return path
+
+    def _add(self, result_key, default):
+        node, path = self._root, self._as_path(result_key)
+        if isinstance(path, WildPath):
+            expressions = [expr for _, _, expr in path.compile().steps]
+        else:
+            expressions = [None] * len(path)
+        for i, key in enumerate(path):
+            if expressions[i] is not None:  # the rest of the path is evaluated as a wild path
+                node.tails.append((result_key, path[i:].compile(), default))
+                return
+            node = node.children.setdefault(key, _Node(key))
+        node.ends.append((result_key, default, isinstance(path, WildPath)))  # without wild keys, but flattened
+
+    def __len__(self):
+        return len(self.paths)
+
+    def __iter__(self):
+        return iter(self.paths)
+
+    def __contains__(self, path):
+        return path in self.paths
+
+    def __repr__(self):
+        return "%s(%r)" % (self.__class__.__name__, [str(path) for path in self.paths])
+
+    def get_in(self, obj, flat=False):
+        """
+        returns {path: value} for all paths in the set, in the order the paths were given; with 'flat' the
+        values of paths with wild keys are flat lists, as with WildPath.get_in(obj, flat=True)
+        """
+        results = dict.fromkeys(self.paths)
+        stack = [(self._root, obj)]
+        while stack:
+            node, obj = stack.pop()
+            for path, _, wild in node.ends:
+                results[path] = [obj] if flat and wild else obj  # as WildPath.get_in(obj, flat=True)
+            for path, compiled, default in node.tails:
+                results[path] = compiled.get_in(obj, default, flat)
+            for child in node.children.values():
+                try:
+                    stack.append((child, child.get(obj)))
+                except (KeyError, IndexError, AttributeError):
+                    for path, default, wild in child.iter_paths():
+                        if default is _marker:
+                            raise
+                        results[path] = [default] if flat and wild else default
+        return results
@@ -1,28 +1,44 @@
-from typing import Mapping, Sequence
+from wildpath.nodes import node_kinds, value_sequence_types, MAPPING, SEQUENCE, OBJECT
 
-value_sequence_types = (str, bytearray, bytes)
+__all__ = ["value_sequence_types", "BIGINT", "dedoubled", "iter_flatten", "flatten"]  # value_sequence_types was defined here
 
 BIGINT = 10**9
 
+_marker = object()
 
-def dedoubled(lst):
-    out_list = []
-    for item in lst:
-        if item not in out_list:
-            out_list.append(item)
-    return out_list
+
+def dedoubled(items):
+    """ returns the items in a list without duplicates, keeping the first occurrence of each """
+    items = list(items)
+    try:
+        return list(dict.fromkeys(items))  # linear time, keeps the order
+    except TypeError:  # unhashable items
+        out_list = []
+        for item in items:
+            if item not in out_list:
+                out_list.append(item)
+        return out_list
+
+
+def iter_flatten(item_s, depth=BIGINT):
+    """ iterates over the values in nested sequences and mappings, in the same order as flatten """
+    stack = [(iter((item_s,)), depth)]
+    while stack:
+        items, depth = stack[-1]
+        for item in items:
+            kind = node_kinds[type(item)]
+            walk = kind.walk
+            if walk == MAPPING and depth > -1:
+                stack.append((iter(item.values()), depth - 1))
+                break
+            elif (walk == SEQUENCE or (kind.read == SEQUENCE and walk == OBJECT)) and depth > -1:  # incl. namedtuples
+                stack.append((iter(item), depth - 1))
+                break
+            yield item
+        else:
+            stack.pop()
 
 
 def flatten(item_s, depth=BIGINT):
     """ turn values in nested sequences and mappings into a flat list """
-    out = []
-    if isinstance(item_s, value_sequence_types):
-        out.append(item_s)
-    elif isinstance(item_s, Mapping) and depth>-1:
-        out.extend(sum((flatten(v, depth-1) for v in item_s.values()), []))
-    elif isinstance(item_s, Sequence) and depth>-1:
-        out.extend(sum((flatten(v, depth-1) for v in item_s), []))
-    else:
-        out.append(item_s)
-    return out
-
+    return list(iter_flatten(item_s, depth))